@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 
 from trade_closer import auto_close_trades
+from journal import JOURNAL_PATH
+from loaders import load_series, recent_trades, recent_signals, pnl_summary
+from refresh import artifact_dir
 from logger import now_ts as pt_now
 from paper_trader import open_trade
 from options import suggest_option
@@ -29,9 +32,14 @@ if custom.strip():
 # ------------------------------------------------
 # Try to load signal and show
 # ------------------------------------------------
-try:
-    bt = pd.read_csv("backtest_results.csv", parse_dates=["datetime"]).set_index("datetime")
-    px = pd.read_csv("data/prices.csv", parse_dates=["datetime"]).set_index("datetime").sort_index()
+# per-ticker artifacts written by batch_refresh.py / refresh.py
+art = artifact_dir(ticker)
+bt_path, px_path = art / "backtest.csv", art / "prices.csv"
+if not (bt_path.exists() and px_path.exists()):
+    st.info(f"No artifacts for {ticker} yet. Run: python batch_refresh.py --tickers {ticker}")
+else:
+    bt = load_series(bt_path)
+    px = load_series(px_path)
 
     last = bt.iloc[-1]
     spot = float(px["close"].iloc[-1])
@@ -88,7 +96,7 @@ try:
     # Paper trade button
     if st.button("Open Paper Trade"):
         try:
-            open_trade({
+            trade_id = open_trade({
                 "ts": pt_now(),
                 "ticker": ticker,
                 "side": "LONG" if rec["entry_bias"] == "LONG" else ("SHORT" if rec["entry_bias"] == "SHORT" else "FLAT"),
@@ -101,28 +109,25 @@ try:
                 "max_loss": round(eq["max_loss"], 2),
                 "status": "OPEN"
             })
-            st.success("Paper trade opened → trades_log.csv")
+            st.success(f"Paper trade #{trade_id} opened → journal.db")
         except Exception as e:
             st.error(str(e))
 
-except Exception:
-    st.info("Pick a ticker and click 'Fetch & Rebuild'.")
-
 # ------------------------------------------------
 # Logs section
 # ------------------------------------------------
 st.divider()
 st.subheader("Signals Log")
 try:
-    logdf = pd.read_csv("signals_log.csv", engine="python", on_bad_lines="skip")
-    st.dataframe(logdf.tail(50), use_container_width=True)
+    logdf = recent_signals(JOURNAL_PATH, 50)
+    st.dataframe(logdf, use_container_width=True)
 except Exception as e:
     st.caption(f"No signals logged yet. ({e})")
 
 st.subheader("Paper Trades")
 try:
-    tdf = pd.read_csv("trades_log.csv", engine="python", on_bad_lines="skip")
-    st.dataframe(tdf.tail(50), use_container_width=True)
+    tdf = recent_trades(JOURNAL_PATH, 50)
+    st.dataframe(tdf, use_container_width=True)
 except Exception as e:
     st.caption(f"No paper trades yet. ({e})")
 
@@ -133,27 +138,19 @@ except Exception as e:
 st.divider()
 if st.button("Auto-Close OPEN Trades"):
     try:
-        res = auto_close_trades(
-            prices_path="data/prices.csv",
-            trades_path="trades_log.csv",
-            max_hold_days=20
-        )
-        st.success(f"Closed {res['closed']} trade(s). OPEN remaining: {res['open_remaining']}")
+        res = auto_close_trades(max_hold_days=20)
+        st.success(f"Closed {res['closed']} trade(s) across {res.get('tickers', 0)} ticker(s). "
+                   f"OPEN remaining: {res['open_remaining']} (+{res.get('monitor_held', 0)} held by the monitor)")
     except Exception as e:
         st.error(str(e))
 
 # Refresh and show updated trades + summary
 try:
-    tdf = pd.read_csv("trades_log.csv", engine="python", on_bad_lines="skip")
+    tdf = recent_trades(JOURNAL_PATH, 50)
+    summary = pnl_summary(JOURNAL_PATH)
     st.subheader("Paper Trades (updated)")
-    st.dataframe(tdf.tail(50), use_container_width=True)
-
-    if "realized_pnl" in tdf.columns:
-        realized = tdf.dropna(subset=["realized_pnl"])
-        total_pnl = realized["realized_pnl"].sum() if not realized.empty else 0.0
-        wins = (realized["realized_pnl"] > 0).sum() if not realized.empty else 0
-        losses = (realized["realized_pnl"] <= 0).sum() if not realized.empty else 0
-        st.caption(f"Realized PnL: {total_pnl:.2f} • Wins: {wins} • Losses: {losses}")
+    st.dataframe(tdf, use_container_width=True)
+    st.caption(f"Realized PnL: {summary['total_pnl']:.2f} • Wins: {summary['wins']} • Losses: {summary['losses']}")
 except Exception:
     pass
 
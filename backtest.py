@@ -1,24 +1,21 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
+from threadpoolctl import threadpool_limits
 from models import fit_models, predict_dist
 
-def walk_forward(df_feat: pd.DataFrame, X: pd.DataFrame, y: pd.Series,
-                 quantiles=(0.15, 0.5, 0.85), cost_bps=1.5, train_frac=0.7):
-    """
-    Simple one-cut walk-forward:
-    - Train on first train_frac of data, test on the rest
-    - Long if median forecast > costs; short if < -costs
-    - PnL uses forward return y (already aligned to features)
-    """
-    n = len(df_feat)
-    cut = max(int(n * train_frac), 50)
-    X_tr, X_te = X.iloc[:cut], X.iloc[cut:]
-    y_tr, y_te = y.iloc[:cut], y.iloc[cut:]
+def _init():
+    threadpool_limits(1)  # one core per worker; the pool is the parallelism
 
-    q_models, mu = fit_models(X_tr, y_tr, quantiles)
-    pred = predict_dist(q_models, mu, X_te)
+def _fit_predict(X_tr, y_tr, X_te, quantiles, backend="gbr", cache=None, params=None, n_jobs=-1):
+    """One fold: train on (X_tr, y_tr), return predictions for X_te (runs in a worker)."""
+    q_models, mu = fit_models(X_tr, y_tr, quantiles, backend=backend, n_jobs=n_jobs,
+                              cache=cache, params=params)
+    return predict_dist(q_models, mu, X_te)
 
-    te = df_feat.iloc[cut:].copy()
+def _score(te: pd.DataFrame, pred: dict, quantiles, cost_bps: float) -> pd.DataFrame:
+    """Turn quantile forecasts into signal / pnl / equity columns."""
     te["q_lo"] = pred[quantiles[0]]
     te["q_md"] = pred[quantiles[1]]
     te["q_hi"] = pred[quantiles[2]]
@@ -38,3 +35,78 @@ def walk_forward(df_feat: pd.DataFrame, X: pd.DataFrame, y: pd.Series,
 
     cols = ["q_lo", "q_md", "q_hi", "signal", "fwd_ret", "pnl", "equity"]
     return te[cols]
+
+def summarize(bt: pd.DataFrame) -> dict:
+    """Headline metrics of a backtest frame (the run_test.py summary)."""
+    return {
+        "trades": int((bt.signal != 0).sum()),
+        "avg_pnl": float(bt.pnl.mean()),
+        "sharpe_like": float((bt.pnl.mean() / (bt.pnl.std() + 1e-9)) * (252**0.5)),
+        "final_equity": float(bt.equity.iloc[-1]),
+    }
+
+def make_folds(n: int, train_size: int, step: int, embargo: int = 0, mode: str = "rolling"):
+    """
+    (train_start, train_end, test_start, test_end) index bounds for each fold.
+    Test blocks of `step` bars tile the series after the first train window;
+    `embargo` bars between train and test are dropped so forward-looking
+    labels of the last training rows cannot overlap the test block.
+    """
+    folds = []
+    start = train_size + embargo
+    while start < n:
+        tr_end = start - embargo
+        tr_start = 0 if mode == "expanding" else max(0, tr_end - train_size)
+        folds.append((tr_start, tr_end, start, min(start + step, n)))
+        start += step
+    return folds
+
+def walk_forward(df_feat: pd.DataFrame, X: pd.DataFrame, y: pd.Series,
+                 quantiles=(0.15, 0.5, 0.85), cost_bps=1.5, train_frac=0.7,
+                 mode="single", train_size=None, step=21, embargo=0, n_jobs=None,
+                 backend="gbr", cache=None, params=None):
+    """
+    Walk-forward backtest:
+    - mode="single": train on first train_frac of data, test on the rest (one cut)
+    - mode="rolling"/"expanding": retrain every `step` bars on the previous
+      `train_size` bars (rolling) or all bars so far (expanding), skipping
+      `embargo` bars between train and test. Folds are fitted in a process pool
+      (n_jobs workers, default all cores; n_jobs=1 runs serially) and stitched
+      into one out-of-sample frame. Pool workers fit on one thread each, and
+      n_jobs=1 also fits the quantiles serially (for callers that are pool
+      workers themselves, e.g. sweep.py / batch_refresh.py).
+    - Long if median forecast > costs; short if < -costs
+    - PnL uses forward return y (already aligned to features)
+    - backend selects the quantile model (see models.BACKENDS); cache is an
+      optional model_cache.ModelCache so unchanged folds skip training;
+      params are per-quantile model overrides (tuning.load_params)
+    Callers using the pool must run under `if __name__ == "__main__":`.
+    """
+    n = len(df_feat)
+    fit_jobs = 1 if n_jobs == 1 else -1
+    if mode == "single":
+        cut = max(int(n * train_frac), 50)
+        X_tr, X_te = X.iloc[:cut], X.iloc[cut:]
+        y_tr = y.iloc[:cut]
+        pred = _fit_predict(X_tr, y_tr, X_te, quantiles, backend, cache, params, fit_jobs)
+        return _score(df_feat.iloc[cut:].copy(), pred, quantiles, cost_bps)
+
+    if mode not in ("rolling", "expanding"):
+        raise ValueError(f"unknown walk-forward mode: {mode}")
+    train_size = train_size or max(int(n * train_frac / 2), 50)
+    folds = make_folds(n, train_size, step, embargo, mode)
+    if not folds:
+        raise ValueError(f"not enough rows ({n}) for train_size={train_size} + embargo={embargo}")
+
+    jobs = [(X.iloc[a:b], y.iloc[a:b], X.iloc[c:d], quantiles, backend, cache, params)
+            for a, b, c, d in folds]
+    workers = n_jobs or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        preds = [_fit_predict(*j, fit_jobs) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init) as ex:
+            preds = list(ex.map(_fit_predict, *zip(*jobs), [1] * len(jobs)))
+
+    pred = {k: np.concatenate([p[k] for p in preds]) for k in preds[0]}
+    te = df_feat.iloc[folds[0][2]:].copy()
+    return _score(te, pred, quantiles, cost_bps)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# bar_store.py
+# Local OHLCV bar store shared by every script that needs price history.
+# Bars are kept as memory-mapped NumPy arrays partitioned by interval and symbol:
+#   data/bars/<adj|raw>/<interval>/<SYMBOL>/{ts.npy, ohlcv.npy, meta.json}
+# On each read only the tail from the bar before the last stored one is fetched;
+# that overlapping closed bar must match what is stored, otherwise the history
+# was re-adjusted at the source (split / dividend) and is downloaded again.
+#
+# Offline use: export BARS_FIXTURE_DIR=/path/to/csvs and every store reads
+# <dir>/<interval>/<SYMBOL>.csv (or <dir>/<SYMBOL>.csv) instead of Yahoo.
+
+import os, json, time, re
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+try:
+    import yfinance as yf
+    HAVE_YF = True
+except Exception:
+    HAVE_YF = False
+
+COLS = ["open", "high", "low", "close", "volume"]
+CHUNK_SIZE = 50  # tickers per multi-ticker request
+TAIL_RTOL = 1e-6  # stored vs re-fetched close of the overlap bar
+BARS_ROOT = Path(__file__).resolve().parent / "data" / "bars"
+
+# ---------- helpers ----------
+
+def period_to_timedelta(period: str) -> Optional[pd.Timedelta]:
+    """Translate a yfinance period string ('5d', '1mo', '2y', 'max') to a Timedelta."""
+    if period in (None, "max"):
+        return None
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", str(period).strip())
+    if not m:
+        raise ValueError(f"unsupported period: {period}")
+    n, unit = int(m.group(1)), m.group(2)
+    days = {"d": 1, "wk": 7, "mo": 31, "y": 366}[unit]
+    return pd.Timedelta(days=n * days)
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a datetime-indexed frame with float open/high/low/close/volume columns."""
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=COLS, index=pd.DatetimeIndex([], name="datetime"), dtype=float)
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    df = df.rename(columns=lambda c: str(c).strip().lower().replace(" ", "_"))
+    if not isinstance(df.index, pd.DatetimeIndex):
+        ts_col = next((c for c in ("datetime", "date", "timestamp", "index") if c in df.columns), df.columns[0])
+        df = df.set_index(pd.to_datetime(df[ts_col])).drop(columns=[ts_col])
+    missing = [c for c in COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"bars missing columns: {missing}")
+    out = df[COLS].apply(pd.to_numeric, errors="coerce").astype(float)
+    out.index.name = "datetime"
+    out = out.dropna(subset=["open", "high", "low", "close"])
+    return out[~out.index.duplicated(keep="last")].sort_index()
+
+def _utc_ns(ts) -> int:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.value
+
+def _safe_name(symbol: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._=-]", "_", symbol.upper())
+
+def chunked(items, size: int):
+    for i in range(0, len(items), max(1, size)):
+        yield items[i:i + size]
+
+def split_multi(df: pd.DataFrame, symbols) -> dict:
+    """Split a multi-ticker yfinance frame (ticker, field) into per-symbol bar frames."""
+    if df is None or len(df) == 0:
+        return {}
+    if not isinstance(df.columns, pd.MultiIndex):
+        return {symbols[0]: normalize_ohlcv(df)} if len(symbols) == 1 else {}
+    level = 0 if set(symbols) & set(df.columns.get_level_values(0)) else 1
+    out = {}
+    for sym in symbols:
+        if sym in df.columns.get_level_values(level):
+            out[sym] = normalize_ohlcv(df.xs(sym, axis=1, level=level))
+    return out
+
+# ---------- sources ----------
+
+class YFinanceSource:
+    """Fetch bars from Yahoo via yfinance."""
+
+    def __init__(self, auto_adjust: bool = True):
+        self.auto_adjust = auto_adjust
+
+    def fetch(self, symbol: str, interval: str, start=None, period: str = "1y") -> pd.DataFrame:
+        if not HAVE_YF:
+            raise RuntimeError("yfinance is not installed")
+        kw = dict(interval=interval, auto_adjust=self.auto_adjust, progress=False, group_by="column")
+        if start is not None:
+            df = yf.download(symbol, start=start, **kw)
+        else:
+            df = yf.download(symbol, period=period, **kw)
+        return normalize_ohlcv(df)
+
+    def fetch_many(self, symbols, interval: str, start=None, period: str = "1y",
+                   chunk_size: int = CHUNK_SIZE) -> dict:
+        """
+        Fetch many symbols with one multi-ticker request per chunk.
+        Symbols that come back empty are retried one at a time.
+        """
+        if not HAVE_YF:
+            raise RuntimeError("yfinance is not installed")
+        kw = dict(interval=interval, auto_adjust=self.auto_adjust, progress=False,
+                  group_by="ticker", threads=True)
+        if start is not None:
+            kw["start"] = start
+        else:
+            kw["period"] = period
+        out = {}
+        for chunk in chunked(list(symbols), chunk_size):
+            try:
+                df = yf.download(tickers=" ".join(chunk), **kw)
+                out.update(split_multi(df, chunk))
+            except Exception:
+                pass
+        for sym in symbols:
+            if sym in out and len(out[sym]):
+                continue
+            try:
+                out[sym] = self.fetch(sym, interval, start=start, period=period)
+            except Exception:
+                out[sym] = normalize_ohlcv(None)
+        return out
+
+class FixtureSource:
+    """Read bars from local CSV fixtures (datetime,open,high,low,close,volume)."""
+
+    def __init__(self, root, latency: float = 0.0):
+        self.root = Path(root)
+        self.latency = latency  # simulated seconds per request, for benchmarks
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        p = self.root / interval / f"{symbol}.csv"
+        return p if p.exists() else self.root / f"{symbol}.csv"
+
+    def fetch(self, symbol: str, interval: str, start=None, period: str = "1y") -> pd.DataFrame:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._read(symbol, interval, start, period)
+
+    def _read(self, symbol: str, interval: str, start, period: str) -> pd.DataFrame:
+        p = self._path(symbol, interval)
+        if not p.exists():
+            return normalize_ohlcv(None)
+        df = normalize_ohlcv(pd.read_csv(p))
+        if start is not None:
+            return df[df.index >= pd.Timestamp(start)]
+        td = period_to_timedelta(period)
+        if td is not None and len(df):
+            df = df[df.index >= df.index[-1] - td]
+        return df
+
+    def fetch_many(self, symbols, interval: str, start=None, period: str = "1y",
+                   chunk_size: int = CHUNK_SIZE) -> dict:
+        out = {}
+        for chunk in chunked(list(symbols), chunk_size):
+            if self.latency:
+                time.sleep(self.latency)  # one simulated round trip per chunk
+            for sym in chunk:
+                out[sym] = self._read(sym, interval, start, period)
+        return out
+
+# ---------- store ----------
+
+class BarStore:
+    """
+    On-disk OHLCV cache. get() returns the requested history and only asks the
+    source for bars from the second-to-last stored one: the last bar is
+    re-fetched because it may have been partial, and the closed bar before it
+    is compared with the stored close. A mismatch means the source re-adjusted
+    the series, and the symbol's full history is fetched again.
+    """
+
+    def __init__(self, root=BARS_ROOT, source=None, max_age: float = 0.0):
+        self.root = Path(root)
+        self.source = source if source is not None else YFinanceSource()
+        self.max_age = max_age  # seconds to trust a partition without hitting the source
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / _safe_name(symbol)
+
+    def _meta(self, symbol: str, interval: str) -> dict:
+        p = self._dir(symbol, interval) / "meta.json"
+        if not p.exists():
+            return {}
+        try:
+            return json.loads(p.read_text())
+        except Exception:
+            return {}
+
+    def read(self, symbol: str, interval: str = "1d", start=None) -> pd.DataFrame:
+        """Read stored bars (no network). Only the slice at/after start is loaded."""
+        d = self._dir(symbol, interval)
+        if not (d / "ts.npy").exists():
+            return normalize_ohlcv(None)
+        ts = np.load(d / "ts.npy", mmap_mode="r")
+        vals = np.load(d / "ohlcv.npy", mmap_mode="r")
+        i0 = 0 if start is None else int(np.searchsorted(ts, _utc_ns(start)))
+        idx = pd.DatetimeIndex(np.array(ts[i0:]).astype("datetime64[ns]"), name="datetime")
+        tz = self._meta(symbol, interval).get("tz")
+        if tz:
+            idx = idx.tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame(np.array(vals[i0:]), index=idx, columns=COLS)
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame, start=None):
+        """Replace the partition for symbol/interval with df; start is the earliest date it covers."""
+        d = self._dir(symbol, interval)
+        d.mkdir(parents=True, exist_ok=True)
+        df = normalize_ohlcv(df)
+        idx = df.index
+        tz = str(idx.tz) if idx.tz is not None else None
+        if tz:
+            idx = idx.tz_convert("UTC").tz_localize(None)
+        for name, arr in (("ts", idx.values.astype("datetime64[ns]").astype(np.int64)),
+                          ("ohlcv", df[COLS].to_numpy(dtype=float))):
+            tmp = d / f"{name}.tmp.npy"
+            np.save(tmp, arr)
+            os.replace(tmp, d / f"{name}.npy")
+        meta = {"start": None if start is None else str(start), "tz": tz,
+                "fetched_at": time.time(), "rows": int(len(df))}
+        (d / "meta.json").write_text(json.dumps(meta))
+
+    def _covers(self, meta: dict, period: str) -> bool:
+        if "start" not in meta:
+            return False
+        if meta["start"] is None:
+            return True
+        td = period_to_timedelta(period)
+        return td is not None and pd.Timestamp(meta["start"]) <= pd.Timestamp.now().normalize() - td
+
+    def get(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Return up-to-date bars covering period (datetime index, OHLCV columns)."""
+        return self.get_many([symbol], period, interval)[symbol]
+
+    def _fetch(self, symbols, interval: str, start=None, period: str = "1y") -> dict:
+        fetch_many = getattr(self.source, "fetch_many", None)
+        if fetch_many:
+            return (fetch_many(symbols, interval, period=period) if start is None
+                    else fetch_many(symbols, interval, start=start))
+        return {s: (self.source.fetch(s, interval, period=period) if start is None
+                    else self.source.fetch(s, interval, start=start)) for s in symbols}
+
+    @staticmethod
+    def _continues(old: pd.DataFrame, new: pd.DataFrame, anchor) -> bool:
+        """True when the re-fetched anchor bar has the stored close (same adjustment)."""
+        if anchor not in new.index:
+            return False
+        return bool(np.isclose(new.at[anchor, "close"], old.at[anchor, "close"], rtol=TAIL_RTOL, atol=0.0))
+
+    def get_many(self, symbols, period: str = "1y", interval: str = "1d") -> dict:
+        """
+        get() for many symbols. Symbols are grouped by what they need (full history
+        or the tail from a given bar) and each group is fetched with the source's
+        batched fetch_many, so requests scale with chunks rather than tickers.
+        """
+        td = period_to_timedelta(period)
+        full, tails, have = [], {}, {}
+        for sym in dict.fromkeys(symbols):
+            meta = self._meta(sym, interval)
+            if not self._covers(meta, period):
+                full.append(sym)
+                continue
+            if time.time() - meta.get("fetched_at", 0) < self.max_age:
+                continue
+            have[sym] = self.read(sym, interval)
+            if len(have[sym]) >= 2:
+                tails.setdefault(have[sym].index[-2], []).append(sym)
+            else:
+                full.append(sym)
+
+        if full:
+            start = None if td is None else pd.Timestamp.now().normalize() - td
+            got = self._fetch(full, interval, period=period)
+            for sym in full:
+                self.write(sym, interval, got.get(sym), start=start)
+        readjusted = {}
+        for anchor, group in tails.items():
+            got = self._fetch(group, interval, start=anchor)
+            for sym in group:
+                new, old = got.get(sym), have[sym]
+                if new is None or not len(new):
+                    continue
+                start = self._meta(sym, interval)["start"]
+                if not self._continues(old, new, anchor):
+                    readjusted.setdefault(start, []).append(sym)
+                    continue
+                self.write(sym, interval, pd.concat([old[old.index < anchor], new]), start=start)
+        for start, group in readjusted.items():
+            # same span as stored: from the recorded start, or everything when it is None
+            got = self._fetch(group, interval, start=start, period="max")
+            for sym in group:
+                new = got.get(sym)
+                if new is not None and len(new):
+                    self.write(sym, interval, new, start=start)
+
+        out = {}
+        for sym in dict.fromkeys(symbols):
+            df = self.read(sym, interval)
+            if td is not None and len(df):
+                df = df[df.index >= df.index[-1] - td]
+            out[sym] = df
+        return out
+
+def default_store(auto_adjust: bool = True, **kw) -> BarStore:
+    """Store used by the scripts: Yahoo-backed unless BARS_FIXTURE_DIR points at local CSVs."""
+    fixtures = os.getenv("BARS_FIXTURE_DIR")
+    source = FixtureSource(fixtures) if fixtures else YFinanceSource(auto_adjust=auto_adjust)
+    return BarStore(BARS_ROOT / ("adj" if auto_adjust else "raw"), source=source, **kw)
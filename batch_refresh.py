@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# batch_refresh.py
+# Refresh a whole universe before the open: one batched bar download, then
+# labels → features (incremental, feature_store.py) → walk_forward per ticker
+# in a process pool.
+# Writes artifacts/<TICKER>/prices.csv and artifacts/<TICKER>/backtest.csv.
+#
+# Run:
+#   python batch_refresh.py                       # ETFs + today's watchlist equities
+#   python batch_refresh.py --tickers SPY QQQ AAPL --workers 4
+
+import argparse, json, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+from threadpoolctl import threadpool_limits
+from bar_store import default_store
+from refresh import refresh_ticker
+
+ETFS = ["SPY", "QQQ", "IWM", "AAPL", "MSFT", "TSLA"]
+
+def watchlist_equities(path="daily_watchlist.json"):
+    p = Path(path)
+    if not p.exists():
+        return []
+    try:
+        ideas = json.loads(p.read_text()).get("ideas", [])
+    except Exception:
+        return []
+    return [i["symbol"] for i in ideas if i.get("asset", "equity") == "equity" and i.get("symbol")]
+
+def _init():
+    threadpool_limits(1)  # one core per worker; the pool is the parallelism
+
+def _run(ticker, bars, n_jobs=None):
+    """Worker: refresh one ticker and return a summary row (errors are reported, not raised)."""
+    t0 = time.perf_counter()
+    try:
+        res = refresh_ticker(ticker, bars=bars, n_jobs=n_jobs)
+        row = {k: res[k] for k in ("ticker", "test_rows", "final_equity", "trades")}
+        row["seconds"] = round(time.perf_counter() - t0, 2)
+        return row
+    except Exception as e:
+        return {"ticker": ticker, "error": str(e), "seconds": round(time.perf_counter() - t0, 2)}
+
+def main():
+    ap = argparse.ArgumentParser(description="Refresh backtest artifacts for many tickers")
+    ap.add_argument("--tickers", nargs="*", default=None, help="Explicit universe (default: ETFs + watchlist)")
+    ap.add_argument("--no-watchlist", action="store_true", help="Skip daily_watchlist.json equities")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    tickers = args.tickers or (ETFS + ([] if args.no_watchlist else watchlist_equities()))
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    print(f"[batch] refreshing {len(tickers)} tickers with {args.workers} workers")
+
+    t0 = time.perf_counter()
+    bars = default_store(auto_adjust=False).get_many(tickers, period="2y", interval="1d")
+    print(f"[batch] bars ready in {time.perf_counter() - t0:.1f}s")
+
+    rows = []
+    if args.workers <= 1:
+        rows = [_run(t, bars.get(t)) for t in tickers]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init) as ex:
+            futs = [ex.submit(_run, t, bars.get(t), 1) for t in tickers]
+            for f in as_completed(futs):
+                rows.append(f.result())
+
+    df = pd.DataFrame(rows).sort_values("ticker")
+    print(df.to_string(index=False))
+    print(f"\n[batch] done in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# bench_models.py
+# Compare quantile model backends on the current data/prices.csv pipeline:
+# fit time and out-of-sample pinball loss per quantile (time-ordered 70/30 split).
+#
+# Run:
+#   python bench_models.py
+#   python bench_models.py --backends gbr hgb --reps 3 --n-jobs 1
+
+import argparse, time
+import pandas as pd
+from sklearn.metrics import mean_pinball_loss
+from labeling import add_labels
+from features import make_features
+from models import fit_models, predict_dist, BACKENDS
+
+def load_xy(path: str):
+    df = pd.read_csv(path, parse_dates=["datetime"]).set_index("datetime").sort_index()
+    for c in ["open","high","low","close","volume"]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    df = df.dropna(subset=["open","high","low","close","volume"])
+    df_l = add_labels(df, horizon=3, tp_sigma=0.8, sl_sigma=0.6, vol_lookback=5)
+    _, X, y = make_features(df_l)
+    return X, y
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--prices", default="data/prices.csv")
+    ap.add_argument("--backends", nargs="*", default=list(BACKENDS))
+    ap.add_argument("--quantiles", nargs="*", type=float, default=[0.15, 0.5, 0.85])
+    ap.add_argument("--reps", type=int, default=3, help="Fits per backend (best time is reported)")
+    ap.add_argument("--n-jobs", type=int, default=-1, help="Threads for the quantile fits")
+    ap.add_argument("--train-frac", type=float, default=0.7)
+    args = ap.parse_args()
+
+    X, y = load_xy(args.prices)
+    cut = int(len(X) * args.train_frac)
+    X_tr, X_te, y_tr, y_te = X.iloc[:cut], X.iloc[cut:], y.iloc[:cut], y.iloc[cut:]
+    qs = tuple(args.quantiles)
+    print(f"rows: train={len(X_tr)} test={len(X_te)} features={X.shape[1]}")
+
+    rows = []
+    for backend in args.backends:
+        times = []
+        for _ in range(args.reps):
+            t0 = time.perf_counter()
+            q_models, mu = fit_models(X_tr, y_tr, qs, backend=backend, n_jobs=args.n_jobs)
+            times.append(time.perf_counter() - t0)
+        pred = predict_dist(q_models, mu, X_te)
+        row = {"backend": backend, "fit_s": round(min(times), 3)}
+        for q in qs:
+            row[f"pinball_{q}"] = round(mean_pinball_loss(y_te, pred[q], alpha=q), 6)
+        row["pinball_mean"] = round(sum(row[f"pinball_{q}"] for q in qs) / len(qs), 6)
+        rows.append(row)
+
+    print(pd.DataFrame(rows).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
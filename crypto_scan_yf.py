@@ -6,7 +6,8 @@
 
 import math
 import pandas as pd
-import yfinance as yf
+from bar_store import default_store
+from indicators import compute_plans
 
 SYMS = ["BTC-USD","ETH-USD","DOGE-USD","SOL-USD","XRP-USD"]
 INTERVAL = "1h"
@@ -14,20 +15,6 @@ PERIOD = "10d"   # enough bars for 14-period indicators; adjust if needed
 ACCOUNT = 500.0
 RISK_DOLLARS = 10.0
 
-def rsi14(close: pd.Series) -> pd.Series:
-    delta = close.diff()
-    up = delta.clip(lower=0).rolling(14, min_periods=14).mean()
-    down = (-delta.clip(upper=0)).rolling(14, min_periods=14).mean()
-    rs = up / down
-    return 100 - 100 / (1 + rs)
-
-def atr14(high, low, close) -> pd.Series:
-    hl = high - low
-    hc = (high - close.shift()).abs()
-    lc = (low - close.shift()).abs()
-    tr = pd.concat([hl, hc, lc], axis=1).max(axis=1)
-    return tr.rolling(14, min_periods=14).mean()
-
 def prep_df(df: pd.DataFrame) -> pd.DataFrame:
     # Normalize yfinance dataframe to have: timestamp, open, high, low, close, volume
     if df is None or df.empty:
@@ -71,9 +58,10 @@ def one_symbol(sym: str):
     # Try short period first; if insufficient rows for indicators, expand
     tried = []
     df = None
+    store = default_store()
     for per in (PERIOD, "30d", "60d"):
         tried.append(per)
-        df = yf.download(sym, period=per, interval=INTERVAL, auto_adjust=True, progress=False, group_by="column")
+        df = store.get(sym, period=per, interval=INTERVAL)
         if df is not None and not df.empty:
             try:
                 tmp = prep_df(df)
@@ -84,30 +72,10 @@ def one_symbol(sym: str):
     if df is None or df.empty:
         raise ValueError(f"no data returned for {sym} (tried periods: {tried})")
     # Final prep
-    dfp = prep_df(df)
-    d = dfp.copy()
-    d["rsi14"] = rsi14(d["close"])
-    d["atr14"] = atr14(d["high"], d["low"], d["close"])
-    d = d.dropna().reset_index(drop=True)
-    if d.empty:
+    plan = compute_plans({sym: prep_df(df)}, RISK_DOLLARS)[sym]
+    if "error" in plan:
         raise ValueError("not enough data after indicators")
-    r = d.iloc[-1]
-    entry = float(r["close"])
-    atr = float(r["atr14"])
-    stop = entry - 1.5 * atr
-    target = entry + 3.0 * atr
-    per_unit = abs(entry - stop)
-    units = int(RISK_DOLLARS // per_unit) if per_unit > 0 else 0
-
-    return {
-        "symbol": sym,
-        "entry": round(entry, 2),
-        "stop": round(stop, 2),
-        "target": round(target, 2),
-        "rsi": round(float(r["rsi14"]), 2),
-        "atr": round(atr, 2),
-        "units": units,
-    }
+    return {"symbol": sym, **plan}
 
 def main():
     rows = []
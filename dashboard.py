@@ -1,33 +1,19 @@
 # dashboard.py — add Accuracy tab (reads eval_log.csv)
-import json
 from pathlib import Path
 import pandas as pd
 import streamlit as st
+from loaders import load_csv, load_json, tail_csv, recent_trades, pnl_summary
+from eval_stats import daily_path
 
 PROJECT_DIR = Path.home() / "Documents" / "ai_trading_copilot"
 WATCHLIST = PROJECT_DIR / "daily_watchlist.json"
-TRADES = PROJECT_DIR / "trades_log.csv"
+JOURNAL = PROJECT_DIR / "journal.db"
 POSITIONS = PROJECT_DIR / "positions.json"
 EVAL = PROJECT_DIR / "eval_log.csv"
+EVAL_DAILY = daily_path(EVAL)
 
 st.set_page_config(page_title="AI Trading Copilot", layout="wide")
 
-def load_json(path: Path):
-    if not path.exists():
-        return {}
-    try:
-        return json.loads(path.read_text())
-    except Exception:
-        return {}
-
-def load_csv(path: Path):
-    if not path.exists():
-        return pd.DataFrame()
-    try:
-        return pd.read_csv(path)
-    except Exception:
-        return pd.DataFrame()
-
 st.title("AI Trading Copilot")
 
 tab1, tab2, tab3, tab4 = st.tabs(["Watchlist", "Open Positions", "Trades", "Accuracy"])
@@ -54,20 +40,19 @@ with tab2:
 
 with tab3:
     st.subheader("Recent Trades")
-    dft = load_csv(TRADES)
+    dft = recent_trades(JOURNAL, 200)
+    summary = pnl_summary(JOURNAL)
     if not dft.empty:
-        st.dataframe(dft.tail(200), use_container_width=True)
+        st.dataframe(dft, use_container_width=True)
         # Simple P&L summary
-        closed = dft[dft["event"].str.startswith("CLOSE")] if "event" in dft.columns else pd.DataFrame()
-        if not closed.empty and "pnl_dollars" in closed.columns:
-            pnl = closed["pnl_dollars"].sum()
-            st.metric("Net Realized P&L ($)", f"{pnl:,.2f}")
+        if summary["wins"] + summary["losses"]:
+            st.metric("Net Realized P&L ($)", f"{summary['total_pnl']:,.2f}")
     else:
         st.info("No trades logged yet.")
 
 with tab4:
     st.subheader("Accuracy (Daily Evaluator)")
-    dfe = load_csv(EVAL)
+    dfe = tail_csv(EVAL, 200)
     if dfe.empty:
         st.info("No eval_log.csv yet. It will populate after the evaluator runs.")
     else:
@@ -79,27 +64,17 @@ with tab4:
             st.warning(f"eval_log.csv missing columns: {missing}")
         # show latest rows
         st.markdown("**Latest Evaluations**")
-        st.dataframe(dfe.tail(200), use_container_width=True)
+        st.dataframe(dfe, use_container_width=True)
 
-        # Daily summary: win/loss/no_trigger counts and win rate
-        def win_flag(x): return 1 if x == "win" else 0
-        def loss_flag(x): return 1 if x == "loss" else 0
-        if "result" in dfe.columns and "date" in dfe.columns:
-            dfe["wins"] = dfe["result"].apply(win_flag)
-            dfe["losses"] = dfe["result"].apply(loss_flag)
-            daily = dfe.groupby("date", as_index=False).agg(
-                total=("result","count"),
-                wins=("wins","sum"),
-                losses=("losses","sum")
-            )
-            # avoid div by zero
-            daily["win_rate_%"] = (daily["wins"] / daily[["wins","losses"]].sum(axis=1).clip(lower=1)) * 100.0
-            daily = daily.sort_values("date")
+        # Daily summary maintained by evaluator.py (eval_stats.py) next to eval_log.csv
+        daily = load_csv(EVAL_DAILY)
+        if not daily.empty:
             st.markdown("**Daily Summary**")
-            st.dataframe(daily, use_container_width=True)
-            # Chart: daily win rate
+            st.dataframe(daily[["date","total","wins","losses","win_rate_%","win_rate_5d_%",
+                                "win_rate_20d_%","avg_rr"]], use_container_width=True)
+            # Chart: daily and rolling win rate
             st.markdown("**Daily Win Rate (%)**")
-            chart_df = daily.set_index("date")[["win_rate_%"]]
+            chart_df = daily.set_index("date")[["win_rate_%","win_rate_5d_%","win_rate_20d_%"]]
             st.line_chart(chart_df)
         else:
-            st.info("Evaluator results available, but missing 'date'/'result' columns to compute accuracy.")
+            st.info("No eval_daily.csv yet. Build it once with: python eval_stats.py")
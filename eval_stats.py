@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# eval_stats.py
+# Daily accuracy table kept next to eval_log.csv (eval_daily.csv).
+# evaluator.main folds each day's new rows into it, so the dashboard reads a
+# few hundred bytes per day of history instead of regrouping the whole log.
+# Stored per date: total, wins, losses, triggered, rr_sum, rr_n; win rates
+# (daily, rolling 5/20-day) and average R:R are derived on write.
+#
+# Run:
+#   python eval_stats.py                 # rebuild eval_daily.csv from eval_log.csv
+
+import sys
+from pathlib import Path
+import pandas as pd
+
+DAILY_NAME = "eval_daily.csv"
+COUNTS = ["total", "wins", "losses", "triggered", "rr_sum", "rr_n"]
+WINDOWS = (5, 20)
+
+def daily_path(eval_log) -> Path:
+    return Path(eval_log).with_name(DAILY_NAME)
+
+def day_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-date counts for a batch of eval rows (vectorized)."""
+    res = df["result"] if "result" in df else pd.Series(index=df.index, dtype=object)
+    rr = pd.to_numeric(df["rr"], errors="coerce") if "rr" in df else pd.Series(index=df.index, dtype=float)
+    trig = pd.to_numeric(df["triggered"], errors="coerce") if "triggered" in df else 0
+    g = pd.DataFrame({
+        "date": df["date"].astype(str),
+        "total": res.notna().astype("int64"),
+        "wins": res.eq("win").astype("int64"),
+        "losses": res.eq("loss").astype("int64"),
+        "triggered": pd.Series(trig, index=df.index).fillna(0).astype("int64"),
+        "rr_sum": rr.fillna(0.0),
+        "rr_n": rr.notna().astype("int64"),
+    })
+    return g.groupby("date").sum()
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype="float64") for c in COUNTS},
+                        index=pd.Index([], name="date", dtype=str))
+
+def with_rates(counts: pd.DataFrame) -> pd.DataFrame:
+    """Add win rates (daily and rolling over days) and average R:R to a counts table."""
+    d = counts.sort_index()
+    ints = [c for c in COUNTS if c != "rr_sum"]
+    d[ints] = d[ints].astype("int64")
+    decided = d["wins"] + d["losses"]
+    out = d.copy()
+    out["win_rate_%"] = (100.0 * d["wins"] / decided.clip(lower=1)).round(2)
+    for w in WINDOWS:
+        wins = d["wins"].rolling(w, min_periods=1).sum()
+        dec = decided.rolling(w, min_periods=1).sum()
+        out[f"win_rate_{w}d_%"] = (100.0 * wins / dec.clip(lower=1)).round(2)
+    out["avg_rr"] = (d["rr_sum"] / d["rr_n"].where(d["rr_n"] > 0)).round(3)
+    return out
+
+def _write(daily: pd.DataFrame, path: Path):
+    tmp = path.with_suffix(".tmp")
+    daily.reset_index().rename(columns={"index": "date"}).to_csv(tmp, index=False)
+    tmp.replace(path)
+
+def load_daily(path) -> pd.DataFrame:
+    p = Path(path)
+    if not p.exists():
+        return _empty()
+    return pd.read_csv(p, dtype={"date": str}, usecols=["date"] + COUNTS).set_index("date")
+
+def rebuild_daily(eval_log, chunksize: int = 100_000) -> pd.DataFrame:
+    """Recompute eval_daily.csv from the full eval log, reading it in chunks."""
+    counts = None
+    for chunk in pd.read_csv(eval_log, chunksize=chunksize, usecols=lambda c: c in ("date", "result", "triggered", "rr")):
+        part = day_counts(chunk)
+        counts = part if counts is None else counts.add(part, fill_value=0)
+    daily = with_rates(counts if counts is not None else _empty())
+    _write(daily, daily_path(eval_log))
+    return daily
+
+def update_daily(new_rows: pd.DataFrame, eval_log) -> pd.DataFrame:
+    """
+    Fold rows just appended to eval_log into eval_daily.csv. Without a daily
+    table yet (older installs) it is rebuilt from the whole log, which already
+    contains new_rows.
+    """
+    path = daily_path(eval_log)
+    if not path.exists():
+        return rebuild_daily(eval_log)
+    counts = load_daily(path).add(day_counts(new_rows), fill_value=0)
+    daily = with_rates(counts)
+    _write(daily, path)
+    return daily
+
+if __name__ == "__main__":
+    from evaluator import EVAL_LOG
+    log = Path(sys.argv[1]) if len(sys.argv) > 1 else EVAL_LOG
+    if not log.exists():
+        sys.exit(f"No eval log at {log}")
+    d = rebuild_daily(log)
+    print(d.tail(20).to_string())
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 # evaluator.py — end-of-day scoring of today's watchlist
 # Checks: (1) did entry cross today? (2) if yes, did target or stop get hit first?
-# Logs a row per symbol to eval_log.csv
+# Daily bars for every symbol come from one batched bar-store call; days that
+# touch both target and stop are ordered with intraday bars (--intraday).
+# Logs a row per symbol to eval_log.csv and folds them into eval_daily.csv
 
-import json, sys
+import argparse, json, sys
 from datetime import datetime, timezone
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import yfinance as yf
+from bar_store import default_store
+from eval_stats import update_daily
 
 PROJECT_DIR = Path.home() / "Documents" / "ai_trading_copilot"
 WATCHLIST = PROJECT_DIR / "daily_watchlist.json"
@@ -25,85 +29,146 @@ def load_watchlist():
         sys.exit("No ideas to evaluate.")
     return ideas
 
-def day_hilo(sym: str, period="5d"):
-    df = yf.download(tickers=sym, period=period, interval="1d",
-                     auto_adjust=True, progress=False)
-    if df is None or df.empty:
-        return None
-    row = df.iloc[-1]
-    # Ensure pure Python floats (avoid pandas/numpy scalar warnings)
-    lo = float(row["Low"].item() if hasattr(row["Low"], "item") else row["Low"])
-    hi = float(row["High"].item() if hasattr(row["High"], "item") else row["High"])
-    opn = float(row["Open"].item() if hasattr(row["Open"], "item") else row["Open"])
-    cls = float(row["Close"].item() if hasattr(row["Close"], "item") else row["Close"])
-    return lo, hi, opn, cls
+def last_bars(daily: dict, symbols) -> pd.DataFrame:
+    """Last daily bar per symbol (NaN row when a symbol has no data)."""
+    rows = {}
+    for sym in symbols:
+        df = daily.get(sym)
+        if df is not None and len(df):
+            r = df.iloc[-1]
+            rows[sym] = {"day": df.index[-1].date(), "open": r["open"], "high": r["high"],
+                         "low": r["low"], "close": r["close"]}
+    cols = ["day", "open", "high", "low", "close"]
+    return pd.DataFrame.from_dict(rows, orient="index", columns=cols).reindex(list(symbols))
 
+def first_touch(bars: pd.DataFrame, entry: float, stop: float, target: float):
+    """
+    Walk one day's intraday bars of a long idea: from the first bar that reaches
+    entry, whichever of target / stop is touched on an earlier bar wins.
+    Returns "win", "loss", or None when both land on the same bar (or no data).
+    """
+    hi = bars["high"].to_numpy(float)
+    lo = bars["low"].to_numpy(float)
+    trig = np.flatnonzero(hi >= entry)
+    if not len(trig):
+        return None
+    hi, lo = hi[trig[0]:], lo[trig[0]:]
+    t = np.flatnonzero(hi >= target)
+    s = np.flatnonzero(lo <= stop)
+    t = t[0] if len(t) else len(hi)
+    s = s[0] if len(s) else len(hi)
+    if t == s:
+        return None
+    return "win" if t < s else "loss"
 
-def score_row(sym, entry, stop, target):
-    # EOD logic:
-    # If High >= entry → entry was triggered.
-    # If entry triggered: if High >= target before Low <= stop -> WIN, else if Low <= stop -> LOSS
-    # With only daily bars, we assume worst-case ambiguity is rare; intraday could refine later.
-    hilo = day_hilo(sym)
-    if not hilo:
-        return {"symbol": sym, "status":"no_data"}
-    lo, hi, opn, cls = hilo
+def score_ideas(ideas, daily: dict, intraday=None) -> pd.DataFrame:
+    """
+    EOD scoring of every idea at once from each symbol's last daily bar:
+    - triggered when High >= entry
+    - win / loss when only the target / only the stop is inside the day's range
+    - both inside the range: resolved from intraday bars when available
+      (intraday(symbols) -> {sym: bars}), else the old distance-from-open heuristic
+    - open when triggered but neither exit was touched
+    Symbols without bars get status no_data; ideas with a missing or non-numeric
+    entry / stop / target get an "error: ..." status instead of a result.
+    """
+    ix = pd.DataFrame(ideas).reindex(columns=["symbol", "entry", "stop", "target"])
+    syms = ix["symbol"].astype(str)
+    levels = {c: pd.to_numeric(ix[c], errors="coerce").to_numpy(float) for c in ("entry", "stop", "target")}
+    entry, stop, target = levels["entry"], levels["stop"], levels["target"]
+    bars = last_bars(daily, syms.unique()).reindex(syms.to_numpy())
+    opn, hi, lo, cls = (bars[c].to_numpy(float) for c in ("open", "high", "low", "close"))
 
     triggered = hi >= entry
-    result = "no_trigger"
-    reached_target = False
-    reached_stop = False
+    reached_target = triggered & (hi >= target)
+    reached_stop = triggered & (lo <= stop)
+    result = np.select(
+        [~triggered, reached_target & ~reached_stop, reached_stop & ~reached_target,
+         reached_target & reached_stop],
+        ["no_trigger", "win", "loss", "both"], "open").astype(object)
+    how = np.where(result == "both", "heuristic", "daily").astype(object)
 
-    if triggered:
-        # If both target and stop are within range, order unknown on daily bars.
-        # Use distance from open as tie-breaker proxy (approximation).
-        reached_target = hi >= target
-        reached_stop = lo <= stop
-        if reached_target and not reached_stop:
-            result = "win"
-        elif reached_stop and not reached_target:
-            result = "loss"
-        elif reached_target and reached_stop:
-            # tie-breaker: whichever is closer to open; heuristic only.
-            dist_t = abs(target - opn)
-            dist_s = abs(opn - stop)
-            result = "win" if dist_t < dist_s else "loss"
-        else:
-            result = "open"  # entry hit but neither exit touched (rare with wide targets)
+    both = np.flatnonzero(result == "both")
+    if len(both) and intraday is not None:
+        intra = intraday(sorted(set(syms.iloc[both])))
+        for k in both:
+            day_bars = intra.get(syms.iloc[k])
+            if day_bars is None or day_bars.empty:
+                continue
+            day_bars = day_bars[pd.Index(day_bars.index.date) == bars["day"].iloc[k]]
+            r = first_touch(day_bars, entry[k], stop[k], target[k])
+            if r is not None:
+                result[k], how[k] = r, "intraday"
+    # tie-breaker: whichever is closer to open; heuristic only.
+    left = result == "both"
+    result[left] = np.where(np.abs(target - opn) < np.abs(opn - stop), "win", "loss")[left]
 
-    rr = abs(target - entry) / max(abs(entry - stop), 1e-9)
-    return {
-        "symbol": sym,
-        "triggered": int(triggered),
+    rr = np.abs(target - entry) / np.maximum(np.abs(entry - stop), 1e-9)
+    no_data = np.isnan(hi)
+    bad = {c: np.isnan(v) for c, v in levels.items()}
+    invalid = np.logical_or.reduce(list(bad.values()))
+    status = np.where(no_data, "no_data", None).astype(object)
+    for k in np.flatnonzero(invalid):
+        status[k] = "error: invalid " + ", ".join(c for c in bad if bad[c][k])
+    skip = no_data | invalid
+    result[skip], how[skip] = None, None
+    out = pd.DataFrame({
+        "symbol": syms.to_numpy(),
+        "triggered": pd.array(np.where(skip, None, triggered.astype(int)), dtype="Int64"),
         "result": result,
-        "open": round(opn,4),
-        "high": round(hi,4),
-        "low": round(lo,4),
-        "close": round(cls,4),
-        "entry": round(entry,4),
-        "stop": round(stop,4),
-        "target": round(target,4),
-        "rr": round(rr,2)
-    }
+        "open": opn.round(4), "high": hi.round(4), "low": lo.round(4), "close": cls.round(4),
+        "entry": entry.round(4), "stop": stop.round(4), "target": target.round(4),
+        "rr": np.where(skip, np.nan, rr.round(2)),
+        "resolved": how,
+        "status": status,
+    })
+    return out
+
+def append_log(df: pd.DataFrame, path: Path = EVAL_LOG):
+    """
+    Append rows in the existing log's column order (a new log takes df's columns).
+    Columns the log does not have yet are added: the file is rewritten once with
+    the wider header, older rows left empty in them.
+    """
+    if not path.exists():
+        df.to_csv(path, index=False)
+        return
+    header = pd.read_csv(path, nrows=0).columns
+    new = [c for c in df.columns if c not in header]
+    if new:
+        old = pd.read_csv(path, dtype=str, keep_default_na=False)
+        tmp = path.with_suffix(".tmp")
+        pd.concat([old, df.astype(object)], ignore_index=True).reindex(
+            columns=list(header) + new).to_csv(tmp, index=False)
+        tmp.replace(path)
+    else:
+        df.reindex(columns=header).to_csv(path, mode="a", header=False, index=False)
 
 def main():
+    ap = argparse.ArgumentParser(description="End-of-day scoring of the watchlist")
+    ap.add_argument("--intraday", default="5m", choices=["1m", "5m", "none"],
+                    help="Bars used to order target vs stop on days that touch both")
+    args = ap.parse_args()
+
     ideas = load_watchlist()
-    rows = []
-    for i in ideas:
-        try:
-            sym = i["symbol"]
-            entry = float(i["entry"]); stop = float(i["stop"]); target = float(i["target"])
-            rows.append(score_row(sym, entry, stop, target))
-        except Exception as e:
-            rows.append({"symbol": i.get("symbol","?"), "status": f"error: {e}"})
+    symbols = sorted({str(i.get("symbol")) for i in ideas if i.get("symbol")})
+    store = default_store()
+    # one batched request for every symbol's recent daily bars
+    daily = store.get_many(symbols, period="5d", interval="1d")
+    intraday = None
+    if args.intraday != "none":
+        intraday = lambda syms: store.get_many(syms, period="5d", interval=args.intraday)
 
-    df = pd.DataFrame(rows)
+    try:
+        df = score_ideas(ideas, daily, intraday)
+    except Exception as e:
+        df = pd.DataFrame([{"symbol": i.get("symbol","?"), "status": f"error: {e}"} for i in ideas])
     df.insert(0, "date", datetime.now().date().isoformat())
     df.insert(1, "ts_utc", utcnow())
-    header = not EVAL_LOG.exists()
-    df.to_csv(EVAL_LOG, mode="a", header=header, index=False)
-    print(df[["date","symbol","result","triggered","rr"]].to_string(index=False))
+    append_log(df)
+    update_daily(df, EVAL_LOG)
+    cols = [c for c in ("date","symbol","result","triggered","rr","resolved") if c in df.columns]
+    print(df[cols].to_string(index=False))
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# feature_store.py
+# Persistent per-symbol feature cache next to the bar store (bar_store.py).
+# Computed features are kept as NumPy arrays keyed by interval, symbol and
+# feature-set version:
+#   data/features/<interval>/<SYMBOL>/v<FEATURE_VERSION>/{ts.npy, feats.npy, inputs.npy, meta.json}
+# update() recomputes only the bars after the last stored one (plus that bar,
+# which may have been partial), using the WARMUP bars before it as context, so
+# a daily refresh costs a few rows instead of the whole history. The stored
+# inputs (close/high/low) of those context bars must match the new bars;
+# otherwise (re-adjusted history, different series) the symbol is rebuilt.
+#
+# Run:
+#   python feature_store.py SPY            # update SPY 1d features from the bar store
+#   python feature_store.py SPY --rebuild
+
+import argparse, json, os, time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from bar_store import _safe_name
+from features import FEATURE_COLS, FEATURE_VERSION, INPUTS, WARMUP, compute_features
+
+FEATURES_ROOT = Path(__file__).resolve().parent / "data" / "features"
+
+def _ts_ns(idx: pd.DatetimeIndex) -> np.ndarray:
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.values.astype("datetime64[ns]").astype(np.int64)
+
+class FeatureStore:
+    """On-disk features per (symbol, interval, feature version), extended incrementally."""
+
+    def __init__(self, root=FEATURES_ROOT, version: int = FEATURE_VERSION):
+        self.root = Path(root)
+        self.version = version
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / _safe_name(symbol) / f"v{self.version}"
+
+    def _load(self, symbol: str, interval: str):
+        """(ts, feats, inputs) memory-mapped, or None when nothing is stored."""
+        d = self._dir(symbol, interval)
+        if not (d / "meta.json").exists():
+            return None
+        try:
+            return tuple(np.load(d / f"{n}.npy", mmap_mode="r") for n in ("ts", "feats", "inputs"))
+        except Exception:
+            return None
+
+    def _write(self, symbol: str, interval: str, ts, feats, inputs, tz):
+        d = self._dir(symbol, interval)
+        d.mkdir(parents=True, exist_ok=True)
+        for name, arr in (("ts", ts), ("feats", feats), ("inputs", inputs)):
+            tmp = d / f"{name}.tmp.npy"
+            np.save(tmp, arr)
+            os.replace(tmp, d / f"{name}.npy")
+        meta = {"version": self.version, "columns": FEATURE_COLS, "tz": tz,
+                "rows": int(len(ts)), "updated_at": time.time()}
+        (d / "meta.json").write_text(json.dumps(meta))
+
+    def read(self, symbol: str, interval: str = "1d") -> pd.DataFrame:
+        """Stored features (no computation); empty frame when none are stored."""
+        got = self._load(symbol, interval)
+        if got is None:
+            return pd.DataFrame(columns=FEATURE_COLS, index=pd.DatetimeIndex([], name="datetime"), dtype=float)
+        ts, feats, _ = got
+        idx = pd.DatetimeIndex(np.array(ts).astype("datetime64[ns]"), name="datetime")
+        tz = json.loads((self._dir(symbol, interval) / "meta.json").read_text()).get("tz")
+        if tz:
+            idx = idx.tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame(np.array(feats), index=idx, columns=FEATURE_COLS)
+
+    def _start(self, stored, ts_new, inp_new) -> int:
+        """
+        Position in the new bars from which features must be computed: 0 when the
+        store cannot be extended, else the last stored bar's position. The WARMUP
+        bars before it must be stored with identical inputs.
+        """
+        if stored is None or not len(stored[0]) or not len(ts_new):
+            return 0
+        s_ts, _, s_inp = stored
+        if ts_new[0] < s_ts[0]:
+            return 0
+        i = int(np.searchsorted(ts_new, s_ts[-1]))
+        j = max(0, i - WARMUP)
+        k = int(np.searchsorted(s_ts, ts_new[j]))
+        if i == j:  # no context in the new bars
+            return 0
+        if not (np.array_equal(s_ts[k:k + i - j], ts_new[j:i])
+                and np.array_equal(s_inp[k:k + i - j], inp_new[j:i])):
+            return 0
+        return i
+
+    def update(self, symbol: str, bars: pd.DataFrame, interval: str = "1d",
+               rebuild: bool = False) -> pd.DataFrame:
+        """
+        Features for bars (aligned on bars.index), computing only what the store
+        does not already hold, and persist the result.
+        """
+        if bars is None or bars.empty:
+            return pd.DataFrame(columns=FEATURE_COLS, index=getattr(bars, "index", None), dtype=float)
+        bars = bars.sort_index()
+        ts_new = _ts_ns(bars.index)
+        inp_new = bars[INPUTS].to_numpy(dtype=float)
+        stored = None if rebuild else self._load(symbol, interval)
+        i = self._start(stored, ts_new, inp_new)
+
+        j = max(0, i - WARMUP)
+        fresh = compute_features(bars.iloc[j:])[FEATURE_COLS].to_numpy(dtype=float)[i - j:]
+        if i:
+            s_ts, s_feats, s_inp = stored
+            keep = int(np.searchsorted(s_ts, ts_new[i])) if i < len(ts_new) else len(s_ts)
+            ts = np.concatenate([s_ts[:keep], ts_new[i:]])
+            feats = np.concatenate([s_feats[:keep], fresh])
+            inputs = np.concatenate([s_inp[:keep], inp_new[i:]])
+        else:
+            ts, feats, inputs = ts_new, fresh, inp_new
+        if i < len(ts_new) or not i:
+            tz = str(bars.index.tz) if bars.index.tz is not None else None
+            self._write(symbol, interval, ts, feats, inputs, tz)
+
+        k = int(np.searchsorted(ts, ts_new[0]))
+        out = pd.DataFrame(feats[k:], index=ts[k:], columns=FEATURE_COLS)
+        if len(out) != len(ts_new) or not np.array_equal(ts[k:], ts_new):
+            out = out.reindex(ts_new)
+        out.index = bars.index
+        return out
+
+def default_feature_store(**kw) -> FeatureStore:
+    return FeatureStore(**kw)
+
+if __name__ == "__main__":
+    from bar_store import default_store
+    ap = argparse.ArgumentParser(description="Update stored features for a symbol")
+    ap.add_argument("symbol")
+    ap.add_argument("--interval", default="1d")
+    ap.add_argument("--period", default="2y")
+    ap.add_argument("--rebuild", action="store_true")
+    args = ap.parse_args()
+
+    bars = default_store(auto_adjust=False).get(args.symbol, period=args.period, interval=args.interval)
+    t0 = time.perf_counter()
+    feats = default_feature_store().update(args.symbol, bars, args.interval, rebuild=args.rebuild)
+    print(f"{args.symbol} {args.interval}: {len(feats)} rows in {time.perf_counter() - t0:.3f}s")
+    print(feats.tail().to_string())
@@ -1,19 +1,214 @@
+#!/usr/bin/env python3
+# features.py
+# Feature registry and engine. Every feature declares the input columns it reads
+# and its lookback (prior bars it needs before the first valid value), so the
+# warmup of any feature set is known exactly instead of being whatever dropna()
+# trims. compute_features() evaluates a set over contiguous float64 arrays:
+# shared intermediates (returns, bar range, prefix sums per series) are built once
+# and each rolling mean/std is then O(n) whatever its window, so adding windows
+# or families costs little.
+#
+# Run:
+#   python features.py                   # registry with inputs and lookback
+#   python features.py r20 vol60 vz20    # warmup for a chosen set
+
+import sys
+from typing import Callable, Dict, List
+import numpy as np
 import pandas as pd
 
-def make_features(df):
+FEATURE_COLS = ["r1","r5","r10","ma5","ma10","vol5","vol10","hi_lo"]  # model inputs
+FEATURE_VERSION = 1  # bump when a feature definition changes (invalidates feature_store.py)
+
+# ---------- arrays ----------
+
+class Arrays:
+    """Contiguous float arrays for one frame plus intermediates shared between features."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self.cache: Dict[tuple, object] = {}
+
+    def col(self, name: str) -> np.ndarray:
+        key = ("col", name)
+        if key not in self.cache:
+            if name == "ret":
+                c = self.col("close")
+                a = np.full(self.n, np.nan)
+                a[1:] = c[1:] / c[:-1] - 1
+            elif name == "hl":
+                a = (self.col("high") - self.col("low")) / self.col("close")
+            else:
+                a = np.ascontiguousarray(pd.to_numeric(self.df[name], errors="coerce").to_numpy(dtype=float))
+            self.cache[key] = a
+        return self.cache[key]
+
+    def centered(self, name: str):
+        """(x minus its mean with NaN as 0, the mean, NaN mask or None when x has no NaN)."""
+        key = ("centered", name)
+        if key not in self.cache:
+            x = self.col(name)
+            bad = np.isnan(x)
+            mu = float(x[~bad].mean()) if not bad.all() else 0.0
+            z = x - mu
+            z[bad] = 0.0
+            self.cache[key] = (z, mu, bad if bad.any() else None)
+        return self.cache[key]
+
+    def rsum(self, name: str, w: int, power: int = 1) -> np.ndarray:
+        """Rolling w-bar sum of centered x**power; NaN where the window is short or holds a NaN."""
+        key = ("rsum", name, w, power)
+        if key not in self.cache:
+            z, _, bad = self.centered(name)
+            if power != 1:
+                pk = ("pow", name, power)
+                if pk not in self.cache:
+                    self.cache[pk] = z ** power
+                z = self.cache[pk]
+            out = rolling_sum(z, w)
+            if bad is not None:
+                lead = int(bad.argmin()) if not bad.all() else self.n
+                if bad[lead:].any():  # gaps inside the series: count NaN per window
+                    out[rolling_sum(bad.astype(float), w) > 0] = np.nan
+                else:
+                    out[:min(lead + w - 1, self.n)] = np.nan
+            self.cache[key] = out
+        return self.cache[key]
+
+    def mean(self, name: str, w: int) -> np.ndarray:
+        """rolling(w).mean()."""
+        key = ("mean", name, w)
+        if key not in self.cache:
+            self.cache[key] = self.rsum(name, w) / w + self.centered(name)[1]
+        return self.cache[key]
+
+    def std(self, name: str, w: int) -> np.ndarray:
+        """rolling(w).std() with ddof=1."""
+        key = ("std", name, w)
+        if key not in self.cache:
+            if w < 2:
+                self.cache[key] = np.full(self.n, np.nan)
+            else:
+                a, b = self.rsum(name, w), self.rsum(name, w, 2)
+                self.cache[key] = np.sqrt(np.maximum(b - a * a / w, 0.0) / (w - 1))
+        return self.cache[key]
+
+def rolling_sum(x: np.ndarray, w: int) -> np.ndarray:
+    """
+    Rolling w-bar sum in O(n), NaN for the first w-1 rows. Prefix sums restart
+    every w rows, so row i = b*w + o is P[b, o] + (total of block b-1 - P[b-1, o])
+    and rounding stays at the scale of one window rather than the whole series.
+    """
+    n = len(x)
+    if n < w or w < 1:
+        return np.full(n, np.nan)
+    nb = -(-n // w)
+    P = np.empty((nb, w))
+    P.ravel()[:n] = x
+    P.ravel()[n:] = 0.0
+    np.cumsum(P, axis=1, out=P)
+    out = np.empty(nb * w)
+    R = out[w:].reshape(nb - 1, w)
+    np.subtract(P[1:], P[:-1], out=R)
+    R += P[:-1, -1:]
+    out[:w - 1] = np.nan
+    out[w - 1] = P[0, -1]
+    return out[:n]
+
+# ---------- registry ----------
+
+class Feature:
+    """A registered feature: input columns, lookback in bars, and fn(Arrays) -> array."""
+    __slots__ = ("name", "inputs", "lookback", "fn")
+
+    def __init__(self, name: str, inputs: List[str], lookback: int, fn: Callable[[Arrays], np.ndarray]):
+        self.name, self.inputs, self.lookback, self.fn = name, list(inputs), int(lookback), fn
+
+REGISTRY: Dict[str, Feature] = {}
+
+def register(name: str, inputs: List[str], lookback: int, fn: Callable[[Arrays], np.ndarray]):
+    if name in REGISTRY:
+        raise ValueError(f"feature already registered: {name}")
+    REGISTRY[name] = Feature(name, inputs, lookback, fn)
+
+def _pct(k):
+    def fn(a):
+        c = a.col("close")
+        out = np.full(a.n, np.nan)
+        out[k:] = c[k:] / c[:-k] - 1
+        return out
+    return fn
+
+def _zscore(col, w):
+    def fn(a):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (a.col(col) - a.mean(col, w)) / a.std(col, w)
+    return fn
+
+for k in (1, 2, 3, 5, 10, 20, 40, 60, 120, 250):
+    register(f"r{k}", ["close"], k, _pct(k))                            # k-bar return
+for w in (5, 10, 20, 50, 100, 200):
+    register(f"ma{w}", ["close"], w - 1,                                # distance to the w-bar mean
+             lambda a, w=w: a.mean("close", w) / a.col("close") - 1)
+for w in (5, 10, 20, 60, 120):
+    register(f"vol{w}", ["close"], w, lambda a, w=w: a.std("ret", w))   # std of 1-bar returns
+register("hi_lo", ["high", "low", "close"], 0, lambda a: a.col("hl"))  # bar range / close
+for w in (5, 10, 20):
+    register(f"rng{w}", ["high", "low", "close"], w - 1, lambda a, w=w: a.mean("hl", w))
+for w in (10, 20, 50):
+    register(f"cz{w}", ["close"], w - 1, _zscore("close", w))           # close z-score
+for w in (5, 20, 60):
+    register(f"vz{w}", ["volume"], w - 1, _zscore("volume", w))         # volume z-score
+
+# ---------- engine ----------
+
+def _specs(names) -> List[Feature]:
+    missing = [n for n in names if n not in REGISTRY]
+    if missing:
+        raise KeyError(f"unknown features: {missing}")
+    return [REGISTRY[n] for n in names]
+
+def warmup(names=FEATURE_COLS) -> int:
+    """Leading rows of a series that lack some feature in names (the longest lookback)."""
+    return max((f.lookback for f in _specs(names)), default=0)
+
+def describe(names=None) -> pd.DataFrame:
+    specs = _specs(list(REGISTRY) if names is None else names)
+    return pd.DataFrame({"feature": [f.name for f in specs],
+                         "inputs": [",".join(f.inputs) for f in specs],
+                         "lookback": [f.lookback for f in specs]})
+
+WARMUP = warmup(FEATURE_COLS)  # 10: r10 and vol10
+INPUTS = sorted({c for f in _specs(FEATURE_COLS) for c in f.inputs})  # close, high, low
+
+def compute_features(df, names=FEATURE_COLS) -> pd.DataFrame:
+    """Features in names for OHLC(V) bars (same index; NaN within each feature's lookback)."""
+    specs = _specs(names)
+    a = Arrays(df)
+    out = np.empty((len(specs), a.n))
+    for row, f in zip(out, specs):
+        row[:] = f.fn(a)
+    return pd.DataFrame(out.T, index=df.index, columns=[f.name for f in specs], copy=False)
+
+def make_features(df, feats=None, names=FEATURE_COLS):
+    """
+    Join feature columns onto df and drop rows without them.
+    feats: precomputed features (e.g. FeatureStore.update) aligned on df's index;
+    computed from df when omitted. Either way the first warmup(names) rows of df
+    are dropped, so both give the same rows.
+    """
+    names = list(names)
     out = df.copy()
-    r = out["close"].pct_change()
-
-    out["r1"] = r
-    out["r5"] = out["close"].pct_change(5)
-    out["r10"] = out["close"].pct_change(10)
-    out["ma5"] = out["close"].rolling(5).mean() / out["close"] - 1
-    out["ma10"] = out["close"].rolling(10).mean() / out["close"] - 1
-    out["vol5"] = r.rolling(5).std()
-    out["vol10"] = r.rolling(10).std()
-    out["hi_lo"] = (out["high"] - out["low"]) / out["close"]
-
-    out = out.dropna()
-    X = out[["r1","r5","r10","ma5","ma10","vol5","vol10","hi_lo"]]
+    feats = compute_features(out, names) if feats is None else feats[names].reindex(out.index)
+    out[names] = feats[names]
+
+    out = out.iloc[warmup(names):].dropna()
+    X = out[names]
     y = out["fwd_ret"] if "fwd_ret" in out.columns else None
     return out, X, y
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(REGISTRY)
+    print(describe(names).to_string(index=False))
+    print(f"\n{len(names)} features, warmup {warmup(names)} bars")
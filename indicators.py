@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# indicators.py
+# Cross-sectional RSI14 / ATR14 and entry/stop/target/units plans.
+# Works on a (time x symbol) panel of 2-D NumPy arrays so a whole scan is a
+# handful of array ops instead of one DataFrame pipeline per symbol.
+
+from typing import Dict, Any, List, Tuple
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ---------- panel ----------
+
+def to_panel(frames: Dict[str, pd.DataFrame], cols=("high", "low", "close")) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Stack per-symbol frames (sorted by time) into right-aligned (T x N) arrays.
+    Row -1 is each symbol's latest bar; shorter histories are NaN-padded at the top,
+    so every column sees exactly its own bar sequence.
+    """
+    symbols = [s for s, df in frames.items() if df is not None and len(df)]
+    T = max((len(frames[s]) for s in symbols), default=0)
+    out = {c: np.full((T, len(symbols)), np.nan) for c in cols}
+    for j, s in enumerate(symbols):
+        df = frames[s]
+        for c in cols:
+            v = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+            out[c][T - len(v):, j] = v
+    return symbols, out
+
+# ---------- indicators ----------
+
+def rolling_mean(a: np.ndarray, n: int) -> np.ndarray:
+    """Same as Series.rolling(n).mean() along axis 0 (NaN until n valid values)."""
+    out = np.full(a.shape, np.nan)
+    if len(a) >= n:
+        out[n - 1:] = sliding_window_view(a, n, axis=0).mean(axis=-1)
+    return out
+
+def diff(a: np.ndarray) -> np.ndarray:
+    out = np.full(a.shape, np.nan)
+    out[1:] = a[1:] - a[:-1]
+    return out
+
+def rsi14(close: np.ndarray, n: int = 14) -> np.ndarray:
+    d = diff(close)
+    up = rolling_mean(np.where(d > 0, d, np.where(np.isnan(d), np.nan, 0.0)), n)
+    dn = rolling_mean(np.where(d < 0, -d, np.where(np.isnan(d), np.nan, 0.0)), n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = up / dn
+        return 100 - 100 / (1 + rs)
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev = np.full(close.shape, np.nan)
+    prev[1:] = close[:-1]
+    # fmax skips NaN the way DataFrame.max(axis=1) does
+    return np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+
+def atr14(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 14) -> np.ndarray:
+    return rolling_mean(true_range(high, low, close), n)
+
+def last_valid_row(*arrays: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index of the last row where every array is non-NaN, per column (and a has-any mask)."""
+    ok = np.ones(arrays[0].shape, dtype=bool)
+    for a in arrays:
+        ok &= ~np.isnan(a)
+    T = ok.shape[0]
+    last = T - 1 - np.argmax(ok[::-1], axis=0) if T else np.zeros(ok.shape[1:], dtype=int)
+    return last, ok.any(axis=0)
+
+# ---------- plans ----------
+
+def plan_arrays(high: np.ndarray, low: np.ndarray, close: np.ndarray, risk: float,
+                atr_floor: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Entry/stop/target/units for every column in one pass:
+    entry = last close, stop = entry - 1.5*ATR, target = entry + 3*ATR, units = risk // (entry - stop).
+    atr_floor keeps stops away from zero distance on illiquid/penny names.
+    """
+    rsi = rsi14(close)
+    atr = atr14(high, low, close)
+    last, has = last_valid_row(rsi, atr)
+    cols = np.arange(close.shape[1])
+    price = close[last, cols]
+    a = atr[last, cols]
+    if atr_floor:
+        a = np.where(price <= 1.0, np.maximum(a, np.maximum(0.01 * price, 0.001)),
+                     np.maximum(a, 0.0025 * price))
+    entry = price
+    stop = entry - 1.5 * a
+    target = entry + 3.0 * a
+    per_unit = np.abs(entry - stop)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        units = np.where(per_unit > 0, np.floor_divide(risk, per_unit), 0)
+    return {"ok": has, "entry": entry, "stop": stop, "target": target,
+            "rsi": rsi[last, cols], "atr": a, "units": units}
+
+def compute_plans(frames: Dict[str, pd.DataFrame], risk: float, atr_floor: bool = False,
+                  fine_ticks: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Plan dicts keyed by symbol; symbols without enough bars get {"error": ...}.
+    fine_ticks rounds sub-$1 prices to 5 decimals instead of 2.
+    """
+    symbols, p = to_panel(frames)
+    out: Dict[str, Dict[str, Any]] = {s: {"error": "no data"} for s in frames if s not in symbols}
+    if not symbols:
+        return out
+    plan = plan_arrays(p["high"], p["low"], p["close"], risk, atr_floor=atr_floor)
+    for j, s in enumerate(symbols):
+        if not plan["ok"][j]:
+            out[s] = {"error": "insufficient data"}
+            continue
+        price = float(plan["entry"][j])
+        nd = 5 if fine_ticks and price < 1 else 2
+        out[s] = {
+            "entry": round(price, nd),
+            "stop": round(float(plan["stop"][j]), nd),
+            "target": round(float(plan["target"][j]), nd),
+            "rsi": round(float(plan["rsi"][j]), 2),
+            "atr": round(float(plan["atr"][j]), nd),
+            "units": int(plan["units"][j]),
+        }
+    return out
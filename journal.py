@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# journal.py
+# Trade / signal journal in SQLite (WAL mode). Opening a trade or logging a
+# signal is one INSERT, closing a trade updates its row by id, and reads go
+# through indexes on status / ticker / ts instead of re-parsing a whole CSV.
+# Writers: paper_trader.open_trade, logger.log_signal, monitor_entries.
+# Readers: trade_closer, app.py, dashboard.py.
+#
+# Run:
+#   python journal.py trades --status OPEN --ticker SPY
+#   python journal.py export trades trades_export.csv
+
+import argparse, os, sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Optional
+import pandas as pd
+
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "journal.db")
+
+# ---------- schema ----------
+# One trade record for every writer (paper trades, monitor triggers, migrated
+# CSV logs). Bump SCHEMA_VERSION when columns are added; Journal() adds the
+# missing columns to an older database and records the version in user_version.
+#   v1: initial trades / signals tables
+#   v2: entry_level (planned entry; entry_spot is the fill), imports checkpoints
+#   v3: closed_at (wall-clock time a close was recorded; close_ts is the market
+#       time of the exit and can be back-dated by trade_closer)
+
+SCHEMA_VERSION = 3
+
+# column -> (SQLite type, pandas dtype used by every reader)
+TRADE_SCHEMA = {
+    "ts": ("TEXT", "datetime64[ns]"), "ticker": ("TEXT", "string"),
+    "side": ("TEXT", "string"), "status": ("TEXT", "string"), "source": ("TEXT", "string"),
+    "entry_spot": ("REAL", "float64"), "entry_level": ("REAL", "float64"),
+    "tp_spot": ("REAL", "float64"), "sl_spot": ("REAL", "float64"),
+    "shares": ("INTEGER", "Int64"), "contracts": ("INTEGER", "Int64"),
+    "risk_per_share": ("REAL", "float64"), "max_loss": ("REAL", "float64"), "rr": ("REAL", "float64"),
+    "close_ts": ("TEXT", "datetime64[ns]"), "close_spot": ("REAL", "float64"), "reason": ("TEXT", "string"),
+    "realized_pnl": ("REAL", "float64"), "pnl_pct": ("REAL", "float64"), "hold_minutes": ("REAL", "float64"),
+    "closed_at": ("TEXT", "string"),
+}
+SIGNAL_SCHEMA = {
+    "ts": ("TEXT", "datetime64[ns]"), "ticker": ("TEXT", "string"), "bias": ("TEXT", "string"),
+    "spot": ("REAL", "float64"), "tp_spot": ("REAL", "float64"), "sl_spot": ("REAL", "float64"),
+    "q_lo": ("REAL", "float64"), "q_md": ("REAL", "float64"), "q_hi": ("REAL", "float64"),
+    "sigma": ("REAL", "float64"), "shares": ("INTEGER", "Int64"), "risk_per_share": ("REAL", "float64"),
+    "max_loss": ("REAL", "float64"), "contracts": ("INTEGER", "Int64"), "max_spend": ("REAL", "float64"),
+}
+TRADE_COLS = {c: t for c, (t, _) in TRADE_SCHEMA.items()}
+SIGNAL_COLS = {c: t for c, (t, _) in SIGNAL_SCHEMA.items()}
+TRADE_DTYPES = {c: d for c, (_, d) in TRADE_SCHEMA.items()}
+SIGNAL_DTYPES = {c: d for c, (_, d) in SIGNAL_SCHEMA.items()}
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS trades_status ON trades(status, ticker)",
+    "CREATE INDEX IF NOT EXISTS trades_ticker_ts ON trades(ticker, ts)",
+    "CREATE INDEX IF NOT EXISTS trades_ts ON trades(ts)",
+    "CREATE INDEX IF NOT EXISTS trades_closed_at ON trades(closed_at)",
+    "CREATE INDEX IF NOT EXISTS signals_ticker_ts ON signals(ticker, ts)",
+    "CREATE INDEX IF NOT EXISTS signals_ts ON signals(ts)",
+]
+TS_COLS = ("ts", "close_ts")
+_CASTS = {"REAL": float, "INTEGER": lambda v: int(float(v)), "TEXT": str}
+
+class TradeRecord:
+    """One journal trade; fields are coerced to the schema types on construction."""
+    __slots__ = tuple(TRADE_SCHEMA)
+
+    def __init__(self, **fields):
+        for c, sql_type in TRADE_COLS.items():
+            v = fields.get(c)
+            if c in TS_COLS:
+                v = _ts(v)
+            else:
+                v = _value(v)
+                if v is not None:
+                    v = _CASTS[sql_type](v)
+            setattr(self, c, v)
+        self.ticker = (self.ticker or "").strip().upper()
+        self.side = self.side.upper() if self.side else None
+        self.status = (self.status or "OPEN").upper()
+        if self.status == "CLOSED" and not self.closed_at:
+            self.closed_at = recorded_now()
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "TradeRecord":
+        return row if isinstance(row, cls) else cls(**{k: v for k, v in row.items() if k in TRADE_COLS})
+
+    def as_row(self) -> Dict[str, Any]:
+        return {c: getattr(self, c) for c in TRADE_COLS}
+
+# ---------- helpers ----------
+
+def recorded_now() -> str:
+    """closed_at stamp: UTC with microseconds, so it sorts as text."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+def _missing(v) -> bool:
+    if v is None:
+        return True
+    if isinstance(v, str):
+        return v.strip() == ""
+    try:
+        return bool(pd.isna(v))
+    except (TypeError, ValueError):
+        return False
+
+def _ts(v) -> Optional[str]:
+    """Timestamps are stored as 'YYYY-MM-DD HH:MM:SS' (UTC if tz-aware) so they sort as text."""
+    if _missing(v):
+        return None
+    t = pd.Timestamp(v)
+    if t.tzinfo is not None:
+        t = t.tz_convert("UTC").tz_localize(None)
+    return t.strftime("%Y-%m-%d %H:%M:%S")
+
+def _value(v):
+    if _missing(v):
+        return None
+    if hasattr(v, "item"):  # numpy scalar -> python
+        v = v.item()
+    return v
+
+def _clean(row: Dict[str, Any], cols: Dict[str, str]) -> Dict[str, Any]:
+    out = {}
+    for k, v in row.items():
+        if k in cols:
+            out[k] = _ts(v) if k in TS_COLS else _value(v)
+    return out
+
+def typed(df: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Cast journal columns to their schema dtypes (no inference)."""
+    for c in df.columns:
+        d = dtypes.get(c)
+        if d is None:
+            continue
+        if d.startswith("datetime"):
+            df[c] = pd.to_datetime(df[c], format="%Y-%m-%d %H:%M:%S", errors="coerce").astype(d)
+        elif d == "Int64":
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+        else:
+            df[c] = df[c].astype(d)
+    return df
+
+def read_trades_csv(path, columns=None, chunksize=None):
+    """
+    Read a trades CSV in the journal layout (e.g. 'journal.py export trades') with
+    explicit dtypes and usecols; chunksize returns an iterator of typed frames.
+    """
+    cols = list(columns) if columns else None
+    dtypes = {c: ("string" if d.startswith("datetime") else d) for c, d in TRADE_DTYPES.items()
+              if cols is None or c in cols}
+    dates = [c for c in TS_COLS if cols is None or c in cols]
+    opts = dict(usecols=cols, dtype=dtypes, parse_dates=dates, date_format="%Y-%m-%d %H:%M:%S")
+    if chunksize:
+        return pd.read_csv(path, chunksize=chunksize, **opts)
+    return pd.read_csv(path, **opts)
+
+def _table_sql(name: str, cols: Dict[str, str]) -> str:
+    body = ", ".join(f"{c} {t}" for c, t in cols.items())
+    return f"CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY AUTOINCREMENT, {body})"
+
+# ---------- journal ----------
+
+class Journal:
+    """SQLite-backed trade and signal journal; one connection per instance."""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+
+    def _migrate(self):
+        """Create or upgrade the tables to SCHEMA_VERSION (columns are only ever added)."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} has schema v{version}; this code knows v{SCHEMA_VERSION}")
+        with self.conn:
+            for table, cols in (("trades", TRADE_COLS), ("signals", SIGNAL_COLS)):
+                self.conn.execute(_table_sql(table, cols))
+                have = {r[1] for r in self.conn.execute(f"PRAGMA table_info({table})")}
+                for c, t in cols.items():
+                    if c not in have:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {c} {t}")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS imports "
+                              "(path TEXT PRIMARY KEY, rows INTEGER, updated TEXT)")
+            for sql in INDEXES:
+                self.conn.execute(sql)
+            if version < 3:  # closes recorded before v3: use the exit time
+                self.conn.execute("UPDATE trades SET closed_at = COALESCE(close_ts, ts) "
+                                  "WHERE status = 'CLOSED' AND closed_at IS NULL")
+            if version < SCHEMA_VERSION:
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _insert(self, table: str, row: Dict[str, Any], cols: Dict[str, str]) -> int:
+        rec = _clean(row, cols)
+        sql = f"INSERT INTO {table} ({', '.join(rec)}) VALUES ({', '.join('?' * len(rec))})"
+        with self.conn:
+            return self.conn.execute(sql, list(rec.values())).lastrowid
+
+    def _select(self, table: str, where: List[str], args: list, limit: Optional[int],
+                columns: Optional[Iterable[str]], chunksize: Optional[int] = None):
+        cols = "id, " + ", ".join(columns) if columns else "*"
+        sql = f"SELECT {cols} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if limit:
+            # newest `limit` rows, returned oldest first
+            sql = f"SELECT * FROM ({sql} ORDER BY id DESC LIMIT {int(limit)}) ORDER BY id"
+        else:
+            sql += " ORDER BY id"
+        dtypes = TRADE_DTYPES if table == "trades" else SIGNAL_DTYPES
+        if chunksize:
+            return (typed(c, dtypes) for c in
+                    pd.read_sql_query(sql, self.conn, params=args, chunksize=chunksize))
+        return typed(pd.read_sql_query(sql, self.conn, params=args), dtypes)
+
+    @staticmethod
+    def _filters(ticker=None, since=None, until=None):
+        where, args = [], []
+        if ticker:
+            where.append("ticker = ?")
+            args.append(str(ticker).upper())
+        if since:
+            where.append("ts >= ?")
+            args.append(_ts(since))
+        if until:
+            where.append("ts < ?")
+            args.append(_ts(until))
+        return where, args
+
+    # trades
+
+    def add_trade(self, row) -> int:
+        """Insert a trade (TradeRecord or dict); returns its id."""
+        rec = TradeRecord.from_row(row).as_row()
+        return self._insert("trades", {k: v for k, v in rec.items() if v is not None}, TRADE_COLS)
+
+    def add_trades(self, rows: Iterable) -> int:
+        """Insert many trades in one transaction; returns the count."""
+        recs = [TradeRecord.from_row(r).as_row() for r in rows]
+        if not recs:
+            return 0
+        cols = list(TRADE_COLS)
+        sql = f"INSERT INTO trades ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        with self.conn:
+            self.conn.executemany(sql, [[r[c] for c in cols] for r in recs])
+        return len(recs)
+
+    def update_trade(self, trade_id: int, **fields):
+        """Set fields on one trade (e.g. status="CLOSED", close_spot=...)."""
+        rec = _clean(fields, TRADE_COLS)
+        if not rec:
+            return
+        if rec.get("status") == "CLOSED" and not rec.get("closed_at"):
+            rec["closed_at"] = recorded_now()
+        sql = f"UPDATE trades SET {', '.join(f'{c} = ?' for c in rec)} WHERE id = ?"
+        with self.conn:
+            self.conn.execute(sql, list(rec.values()) + [int(trade_id)])
+
+    def update_trades(self, updates: pd.DataFrame):
+        """Apply per-row updates from a frame with an id column, in one transaction."""
+        cols = [c for c in updates.columns if c in TRADE_COLS]
+        if updates.empty or not cols:
+            return
+        stamp = "status" in cols and "closed_at" not in cols
+        sql_cols = cols + (["closed_at"] if stamp else [])
+        sql = f"UPDATE trades SET {', '.join(f'{c} = ?' for c in sql_cols)} WHERE id = ?"
+        now, rows = recorded_now(), []
+        for rec in updates[cols + ["id"]].to_dict("records"):
+            clean = _clean(rec, TRADE_COLS)
+            if stamp:
+                clean["closed_at"] = now if clean.get("status") == "CLOSED" else None
+            rows.append([clean.get(c) for c in sql_cols] + [int(rec["id"])])
+        with self.conn:
+            self.conn.executemany(sql, rows)
+
+    def trades(self, status=None, ticker=None, since=None, until=None, limit=None,
+               columns=None, closed_since=None, recorded_after=None, chunksize=None):
+        """
+        Trades filtered by status / ticker / ts range (indexed), oldest first.
+        closed_since filters on close_ts (market time of the exit), recorded_after
+        on closed_at (when the close was written). With chunksize, returns an
+        iterator of typed frames instead of one frame.
+        """
+        where, args = self._filters(ticker, since, until)
+        if status:
+            where.insert(0, "status = ?")
+            args.insert(0, str(status).upper())
+        if closed_since:
+            where.append("close_ts >= ?")
+            args.append(_ts(closed_since))
+        if recorded_after:
+            where.append("closed_at > ?")
+            args.append(str(recorded_after))
+        return self._select("trades", where, args, limit, columns, chunksize)
+
+    def pnl_summary(self) -> Dict[str, float]:
+        """Realized P&L, wins and losses over closed trades (computed in SQL)."""
+        total, wins, losses = self.conn.execute(
+            "SELECT COALESCE(SUM(realized_pnl), 0), "
+            "COALESCE(SUM(realized_pnl > 0), 0), COALESCE(SUM(realized_pnl <= 0), 0) "
+            "FROM trades WHERE realized_pnl IS NOT NULL").fetchone()
+        return {"total_pnl": float(total), "wins": int(wins), "losses": int(losses)}
+
+    # signals
+
+    def add_signal(self, row: Dict[str, Any]) -> int:
+        row = dict(row)
+        row["ticker"] = str(row.get("ticker", "")).upper()
+        return self._insert("signals", row, SIGNAL_COLS)
+
+    def add_signals(self, rows: Iterable[Dict[str, Any]]) -> int:
+        cols = list(SIGNAL_COLS)
+        recs = []
+        for row in rows:
+            rec = _clean(row, SIGNAL_COLS)
+            rec["ticker"] = str(rec.get("ticker") or "").upper()
+            recs.append([rec.get(c) for c in cols])
+        if recs:
+            sql = f"INSERT INTO signals ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+            with self.conn:
+                self.conn.executemany(sql, recs)
+        return len(recs)
+
+    def signals(self, ticker=None, since=None, until=None, limit=None, columns=None) -> pd.DataFrame:
+        where, args = self._filters(ticker, since, until)
+        return self._select("signals", where, args, limit, columns)
+
+def open_journal(path=None) -> Journal:
+    return Journal(path or JOURNAL_PATH)
+
+# ---------- CLI ----------
+
+def main():
+    ap = argparse.ArgumentParser(description="Query or export the trade/signal journal")
+    ap.add_argument("--db", default=JOURNAL_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    q = sub.add_parser("trades", help="List trades")
+    q.add_argument("--status")
+    q.add_argument("--ticker")
+    q.add_argument("--since")
+    q.add_argument("--limit", type=int, default=50)
+    s = sub.add_parser("signals", help="List signals")
+    s.add_argument("--ticker")
+    s.add_argument("--since")
+    s.add_argument("--limit", type=int, default=50)
+    e = sub.add_parser("export", help="Write a table to CSV")
+    e.add_argument("table", choices=["trades", "signals"])
+    e.add_argument("out")
+    args = ap.parse_args()
+
+    with Journal(args.db) as j:
+        if args.cmd == "trades":
+            df = j.trades(status=args.status, ticker=args.ticker, since=args.since, limit=args.limit)
+        elif args.cmd == "signals":
+            df = j.signals(ticker=args.ticker, since=args.since, limit=args.limit)
+        else:
+            df = j.trades() if args.table == "trades" else j.signals()
+            df.to_csv(args.out, index=False)
+            print(f"Wrote {len(df)} rows → {args.out}")
+            return
+    print(df.to_string(index=False) if not df.empty else "(no rows)")
+
+if __name__ == "__main__":
+    main()
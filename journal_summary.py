@@ -1,73 +1,165 @@
-cat > journal_summary.py << 'PY'
 #!/usr/bin/env python3
 # journal_summary.py
-# Summarize trades_log.csv -> overall & per-symbol stats.
+# Summarize closed journal trades -> overall & per-symbol stats.
+# Trades are read in chunks and folded into running per-symbol aggregates
+# (count, wins, P&L sum, hold sum, best, worst), so memory stays flat however
+# long the history gets. --checkpoint keeps those aggregates between runs and
+# only folds in trades closed since the previous run; --since limits the
+# summary to trades that exited on or after a date.
+#
+# Run:
+#   python journal_summary.py
+#   python journal_summary.py --since 2025-09-01
+#   python journal_summary.py --checkpoint summary_state.json   # daily, incremental
+#   python journal_summary.py --csv trades_export.csv            # 'journal.py export trades' output
 
 import argparse
+import json
 import sys
 import pandas as pd
 from pathlib import Path
+from journal import Journal, JOURNAL_PATH, read_trades_csv
 
-def load_trades(path: Path) -> pd.DataFrame:
-    if not path.exists():
-        sys.exit(f"File not found: {path}")
-    df = pd.read_csv(path)
-    if df.empty:
-        sys.exit("trades_log.csv is empty.")
-    # Ensure expected columns
-    needed = {"timestamp_utc","event","symbol","side","last","entry","stop",
-              "target","units","rr","pnl_dollars","pnl_pct","hold_minutes"}
-    missing = [c for c in needed if c not in df.columns]
-    if missing:
-        sys.exit(f"Missing columns in log: {missing}")
-    df["timestamp_utc"] = pd.to_datetime(df["timestamp_utc"], errors="coerce", utc=True)
-    return df.sort_values("timestamp_utc").reset_index(drop=True)
-
-def overall_stats(df: pd.DataFrame) -> pd.DataFrame:
-    closed = df[df["event"].str.startswith("CLOSE")].copy()
-    if closed.empty:
+COLUMNS = ["ticker", "status", "realized_pnl", "hold_minutes", "close_ts", "closed_at"]
+# how two partial aggregates for the same symbol combine
+COMBINE = {"trades": "sum", "wins": "sum", "pnl_sum": "sum", "hold_sum": "sum",
+           "hold_n": "sum", "best": "max", "worst": "min"}
+
+# ---------- aggregation ----------
+
+def chunk_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-symbol partial aggregates for one chunk of closed trades."""
+    df = df[df["realized_pnl"].notna()]
+    df = df.assign(win=(df["realized_pnl"] > 0).astype("int64"),
+                   hold_n=df["hold_minutes"].notna().astype("int64"))
+    return df.groupby("ticker").agg(
+        trades=("realized_pnl", "count"),
+        wins=("win", "sum"),
+        pnl_sum=("realized_pnl", "sum"),
+        hold_sum=("hold_minutes", "sum"),
+        hold_n=("hold_n", "sum"),
+        best=("realized_pnl", "max"),
+        worst=("realized_pnl", "min"),
+    )
+
+def combine(acc: pd.DataFrame, part: pd.DataFrame) -> pd.DataFrame:
+    if acc is None or acc.empty:
+        return part
+    if part.empty:
+        return acc
+    return pd.concat([acc, part]).groupby(level=0).agg(COMBINE)
+
+def fold(chunks, acc=None, since=None, after=None):
+    """Fold chunks of trades into acc; returns (acc, latest closed_at seen)."""
+    last = after
+    for df in chunks:
+        df = df[df["status"] == "CLOSED"]
+        if since is not None:
+            df = df[df["close_ts"] >= since]
+        if after is not None:
+            df = df[df["closed_at"] > after]
+        if df.empty:
+            continue
+        acc = combine(acc, chunk_stats(df))
+        top = df["closed_at"].max()
+        if pd.notna(top) and (last is None or top > last):
+            last = top
+    return acc, last
+
+def per_symbol_stats(acc: pd.DataFrame) -> pd.DataFrame:
+    if acc is None or acc.empty:
+        return pd.DataFrame(columns=["symbol","trades","win_rate_%","net_pnl_$",
+                                     "avg_pnl_$","avg_hold_min","best_$","worst_$"])
+    out = pd.DataFrame({
+        "symbol": acc.index,
+        "trades": acc["trades"].astype(int).to_numpy(),
+        "win_rate_%": (100.0 * acc["wins"] / acc["trades"]).round(2).to_numpy(),
+        "net_pnl_$": acc["pnl_sum"].round(2).to_numpy(),
+        "avg_pnl_$": (acc["pnl_sum"] / acc["trades"]).round(2).to_numpy(),
+        "avg_hold_min": (acc["hold_sum"] / acc["hold_n"].where(acc["hold_n"] > 0)).round(1).to_numpy(),
+        "best_$": acc["best"].round(2).to_numpy(),
+        "worst_$": acc["worst"].round(2).to_numpy(),
+    })
+    return out.sort_values("net_pnl_$", ascending=False).reset_index(drop=True)
+
+def overall_stats(acc: pd.DataFrame) -> pd.DataFrame:
+    if acc is None or acc.empty:
         return pd.DataFrame([{"trades":0,"win_rate_%":0.0,"net_pnl_$":0.0,
                               "avg_pnl_$":0.0,"avg_hold_min":0.0}])
-    wins = closed["pnl_dollars"] > 0
+    n = int(acc["trades"].sum())
+    hold_n = acc["hold_n"].sum()
     out = {
-        "trades": int(len(closed)),
-        "win_rate_%": round(100.0 * wins.mean(), 2),
-        "net_pnl_$": round(closed["pnl_dollars"].sum(), 2),
-        "avg_pnl_$": round(closed["pnl_dollars"].mean(), 2),
-        "avg_hold_min": round(closed["hold_minutes"].mean(), 1),
-        "best_$": round(closed["pnl_dollars"].max(), 2),
-        "worst_$": round(closed["pnl_dollars"].min(), 2),
+        "trades": n,
+        "win_rate_%": round(100.0 * acc["wins"].sum() / n, 2),
+        "net_pnl_$": round(acc["pnl_sum"].sum(), 2),
+        "avg_pnl_$": round(acc["pnl_sum"].sum() / n, 2),
+        "avg_hold_min": round(acc["hold_sum"].sum() / hold_n, 1) if hold_n else float("nan"),
+        "best_$": round(acc["best"].max(), 2),
+        "worst_$": round(acc["worst"].min(), 2),
     }
     return pd.DataFrame([out])
 
-def per_symbol_stats(df: pd.DataFrame) -> pd.DataFrame:
-    closed = df[df["event"].str.startswith("CLOSE")].copy()
-    if closed.empty:
-        return pd.DataFrame(columns=["symbol","trades","win_rate_%","net_pnl_$",
-                                     "avg_pnl_$","avg_hold_min"])
-    g = closed.groupby("symbol", as_index=False).agg(
-        trades=("pnl_dollars","count"),
-        win_rate_%=("pnl_dollars", lambda s: round(100.0*(s>0).mean(),2)),
-        net_pnl_$=("pnl_dollars", lambda s: round(s.sum(),2)),
-        avg_pnl_$=("pnl_dollars", lambda s: round(s.mean(),2)),
-        avg_hold_min=("hold_minutes", lambda s: round(s.mean(),1)),
-    )
-    return g.sort_values("net_pnl_$", ascending=False).reset_index(drop=True)
+# ---------- checkpoint ----------
+
+def load_checkpoint(path: Path, source: str, since):
+    """(aggregates, last closed_at) from a previous run over the same source and --since."""
+    if not path.exists():
+        return None, None
+    state = json.loads(path.read_text())
+    if state.get("source") != source or state.get("since") != (str(since.date()) if since is not None else None):
+        print(f"[summary] {path} was built for another source/--since; starting over")
+        return None, None
+    acc = pd.DataFrame.from_dict(state.get("per_symbol", {}), orient="index")
+    return (acc if not acc.empty else None), state.get("recorded_through")
+
+def save_checkpoint(path: Path, source: str, since, acc, last):
+    state = {
+        "source": source,
+        "since": str(since.date()) if since is not None else None,
+        "recorded_through": last,
+        "per_symbol": {} if acc is None else acc.to_dict("index"),
+    }
+    path.write_text(json.dumps(state, indent=2, default=float))
+
+# ---------- main ----------
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--csv", default="trades_log.csv", help="Path to trades log CSV")
+    ap.add_argument("--db", default=JOURNAL_PATH, help="Journal database")
+    ap.add_argument("--csv", default=None, help="Summarize an exported trades CSV instead")
+    ap.add_argument("--since", default=None, help="Only trades that exited on/after this date")
+    ap.add_argument("--checkpoint", default=None, help="State file for incremental runs")
+    ap.add_argument("--chunksize", type=int, default=50_000)
     args = ap.parse_args()
-    path = Path(args.csv)
-    df = load_trades(path)
+
+    since = pd.Timestamp(args.since) if args.since else None
+    source = str(Path(args.csv or args.db).resolve())
+    ckpt = Path(args.checkpoint) if args.checkpoint else None
+    acc, after = load_checkpoint(ckpt, source, since) if ckpt else (None, None)
+
+    if args.csv:
+        if not Path(args.csv).exists():
+            sys.exit(f"File not found: {args.csv}")
+        acc, last = fold(read_trades_csv(args.csv, columns=COLUMNS, chunksize=args.chunksize),
+                         acc, since, after)
+    else:
+        if not Path(args.db).exists():
+            sys.exit(f"Journal not found: {args.db}")
+        with Journal(args.db) as j:
+            chunks = j.trades(status="CLOSED", columns=COLUMNS, closed_since=since,
+                              recorded_after=after, chunksize=args.chunksize)
+            acc, last = fold(chunks, acc, after=after)
+
     print("\n=== OVERALL ===")
-    print(overall_stats(df).to_string(index=False))
+    overall = overall_stats(acc)
+    print(overall.to_string(index=False))
     print("\n=== PER SYMBOL ===")
-    per = per_symbol_stats(df)
+    per = per_symbol_stats(acc)
     print("(no closed trades yet)" if per.empty else per.to_string(index=False))
-    overall_stats(df).to_csv("summary_overall.csv", index=False)
+    overall.to_csv("summary_overall.csv", index=False)
     per.to_csv("summary_by_symbol.csv", index=False)
+    if ckpt:
+        save_checkpoint(ckpt, source, since, acc, last)
 
 if __name__ == "__main__":
     main()
-PY
@@ -1,12 +1,68 @@
 import numpy as np
+import pandas as pd
+
+def first_touch(close, high, low, up, down, horizon: int, tie: int = -1):
+    """
+    Triple-barrier first touch for every bar at once.
+    For row i the barriers are close[i] * (1 + up[i]) above, close[i] * (1 - down[i])
+    below and bar i + horizon in time; bars i+1 .. i+horizon are scanned one
+    offset at a time across all rows (O(n * horizon) work, O(n) memory).
+    Returns float arrays (NaN where the horizon runs past the data with no touch):
+    - label: 1 upper first, -1 lower first, 0 vertical barrier; `tie` when both
+      are touched on the same bar (bar order within a bar is unknown)
+    - bars: offset of the deciding bar (horizon for the vertical barrier)
+    - ret: realized barrier return (up, -down, or close-to-close at the vertical)
+    """
+    close = np.asarray(close, dtype=float)
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    n = len(close)
+    tp_px = close * (1 + np.asarray(up, dtype=float))
+    sl_px = close * (1 - np.asarray(down, dtype=float))
+
+    never = horizon + 1
+    first_tp = np.full(n, never, dtype=np.int32)
+    first_sl = np.full(n, never, dtype=np.int32)
+    for k in range(1, min(horizon, n - 1) + 1):
+        m = n - k
+        t = first_tp[:m]
+        t[(t == never) & (high[k:] >= tp_px[:m])] = k
+        s = first_sl[:m]
+        s[(s == never) & (low[k:] <= sl_px[:m])] = k
+
+    hit_tp = first_tp < never
+    hit_sl = first_sl < never
+    up_first = hit_tp & (first_tp < first_sl)
+    dn_first = hit_sl & (first_sl < first_tp)
+    same_bar = hit_tp & hit_sl & (first_tp == first_sl)
+    touched = hit_tp | hit_sl
+    complete = touched | (np.arange(n) + horizon < n)
+
+    label = np.select([up_first, dn_first, same_bar], [1.0, -1.0, float(tie)], 0.0)
+    bars = np.where(touched, np.minimum(first_tp, first_sl), horizon).astype(float)
+
+    vert = np.full(n, np.nan)
+    if horizon < n:
+        vert[:n - horizon] = close[horizon:] / close[:n - horizon] - 1
+    up_ret = tp_px / close - 1
+    dn_ret = sl_px / close - 1
+    tie_ret = up_ret if tie > 0 else dn_ret if tie < 0 else vert
+    ret = np.select([up_first, dn_first, same_bar], [up_ret, dn_ret, tie_ret], vert)
+
+    label[~complete] = np.nan
+    bars[~complete] = np.nan
+    ret[~complete] = np.nan
+    return label, bars, ret
 
 def add_labels(df, horizon=20, tp_sigma=1.0, sl_sigma=0.7, vol_lookback=50):
     """
-    Adds trade labels using a triple-barrier style method.
+    Adds trade labels using a triple-barrier method (first touch wins).
     - df: DataFrame with 'close','high','low'
     - horizon: number of bars to look ahead
     - tp_sigma/sl_sigma: multipliers for take-profit / stop-loss thresholds
     - vol_lookback: rolling window for volatility estimate
+    Adds label (1 TP first, -1 SL first or same-bar touch, 0 neither), touch_time
+    (bar that decided the label), barrier_ret (return at that barrier), fwd_ret, sigma.
     """
     out = df.copy()
     r = out["close"].pct_change()
@@ -15,21 +71,18 @@ def add_labels(df, horizon=20, tp_sigma=1.0, sl_sigma=0.7, vol_lookback=50):
     fwd = out["close"].shift(-horizon)
     fwd_ret = (fwd - out["close"]) / out["close"]
 
-    high_fwd = out["high"].shift(-1).rolling(horizon).max()
-    low_fwd  = out["low"].shift(-1).rolling(horizon).min()
-
     tp = sigma * tp_sigma
     sl = sigma * sl_sigma
+    label, bars, ret = first_touch(out["close"], out["high"], out["low"], tp, sl, horizon)
 
-    ret_tp = (high_fwd - out["close"]) / out["close"]
-    ret_sl = (out["close"] - low_fwd) / out["close"]
-
-    hit_tp = ret_tp >= tp
-    hit_sl = ret_sl >= sl
-
-    label = np.where(hit_tp, 1, np.where(hit_sl, -1, 0))
+    pos = np.arange(len(out)) + np.nan_to_num(bars, nan=0).astype(int)
+    touch_time = pd.Series(out.index[np.minimum(pos, len(out) - 1)], index=out.index)
 
     out["label"] = label
+    out["touch_time"] = touch_time.where(~np.isnan(bars))
+    out["barrier_ret"] = ret
     out["fwd_ret"] = fwd_ret
     out["sigma"] = sigma
-    return out.dropna()
+    out = out.dropna()
+    out["label"] = out["label"].astype(int)
+    return out
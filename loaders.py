@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# loaders.py
+# Cached file loaders for app.py / dashboard.py. Every Streamlit rerun used to
+# re-parse the watchlist, positions, artifacts, journal and eval log; here each
+# result is kept in a small in-process LRU keyed by (path, mtime, size) of the
+# files it was built from, so a file is parsed again only after it changes.
+# Derived views (P&L totals) are cached the same way.
+# Cached objects are shared between reruns and sessions: treat them as read-only.
+
+import io, json, os, threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+import pandas as pd
+from journal import Journal
+
+MAX_ENTRIES = 64
+
+_cache: "OrderedDict[tuple, object]" = OrderedDict()
+_lock = threading.Lock()
+
+def file_key(path) -> Optional[Tuple[str, int, int]]:
+    """(path, mtime_ns, size), or None if the file does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return str(path), st.st_mtime_ns, st.st_size
+
+def journal_key(path) -> tuple:
+    """A WAL-mode journal changes through its -wal file as well as the main file."""
+    return file_key(path), file_key(f"{path}-wal")
+
+def cached(fn: Callable, *paths, args: tuple = (), journal: bool = False):
+    """fn(*paths, *args), recomputed only when one of the paths changed."""
+    keys = tuple(journal_key(p) if journal else file_key(p) for p in paths)
+    key = (fn.__module__, fn.__qualname__, args, keys)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = fn(*paths, *args)
+    with _lock:
+        _cache[key] = value
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return value
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+# ---------- parsers ----------
+
+def _json(path) -> dict:
+    try:
+        return json.loads(Path(path).read_text())
+    except Exception:
+        return {}
+
+def _csv(path) -> pd.DataFrame:
+    try:
+        return pd.read_csv(path)
+    except Exception:
+        return pd.DataFrame()
+
+def _series(path) -> pd.DataFrame:
+    return pd.read_csv(path, parse_dates=["datetime"]).set_index("datetime").sort_index()
+
+def _tail(path, n) -> pd.DataFrame:
+    """Header plus the last n lines, read backwards from the end of the file."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = f.tell()
+        end = f.seek(0, os.SEEK_END)
+        pos, buf = end, b""
+        while pos > start and buf.count(b"\n") <= n:
+            step = min(64 * 1024, pos - start)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = buf.splitlines()[-n:]
+    try:
+        return pd.read_csv(io.BytesIO(header + b"\n".join(lines) + b"\n"))
+    except Exception:
+        return pd.DataFrame()
+
+def _trades(path, limit) -> pd.DataFrame:
+    with Journal(path) as j:
+        return j.trades(limit=limit)
+
+def _signals(path, limit) -> pd.DataFrame:
+    with Journal(path) as j:
+        return j.signals(limit=limit)
+
+def _pnl(path) -> dict:
+    with Journal(path) as j:
+        return j.pnl_summary()
+
+# ---------- loaders ----------
+
+def load_json(path) -> dict:
+    return cached(_json, path) if Path(path).exists() else {}
+
+def load_csv(path) -> pd.DataFrame:
+    return cached(_csv, path) if Path(path).exists() else pd.DataFrame()
+
+def tail_csv(path, n: int = 200) -> pd.DataFrame:
+    """Last n rows of a CSV without parsing the rest of it."""
+    return cached(_tail, path, args=(n,)) if Path(path).exists() else pd.DataFrame()
+
+def load_series(path) -> pd.DataFrame:
+    """Datetime-indexed CSV (prices.csv / backtest.csv artifacts)."""
+    return cached(_series, path)
+
+def recent_trades(path, limit: int = 50) -> pd.DataFrame:
+    return cached(_trades, path, args=(limit,), journal=True) if Path(path).exists() else pd.DataFrame()
+
+def recent_signals(path, limit: int = 50) -> pd.DataFrame:
+    return cached(_signals, path, args=(limit,), journal=True) if Path(path).exists() else pd.DataFrame()
+
+def pnl_summary(path) -> dict:
+    if not Path(path).exists():
+        return {"total_pnl": 0.0, "wins": 0, "losses": 0}
+    return cached(_pnl, path, journal=True)
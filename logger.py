@@ -1,6 +1,5 @@
-import os, csv, time
-
-LOG_PATH = "signals_log.csv"
+import time
+from journal import Journal, JOURNAL_PATH
 
 FIELDS = [
     "ts","ticker","bias","spot","tp_spot","sl_spot",
@@ -9,17 +8,13 @@ FIELDS = [
     "contracts","max_spend"
 ]
 
-def log_signal(row: dict, path: str = LOG_PATH):
-    """Append a row to signals_log.csv (creates file with header if missing)."""
-    os.makedirs(os.path.dirname(path), exist_ok=True) if os.path.dirname(path) else None
-    is_new = not os.path.exists(path)
-    with open(path, "a", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=FIELDS)
-        if is_new:
-            w.writeheader()
-        out = {k: row.get(k, "") for k in FIELDS}
-        w.writerow(out)
-    print(f"[Logger] wrote to {path}")
+def log_signal(row: dict, path: str = JOURNAL_PATH) -> int:
+    """Append a signal to the journal's signals table; returns its id."""
+    out = {k: row.get(k, "") for k in FIELDS}
+    with Journal(path) as j:
+        sid = j.add_signal(out)
+    print(f"[Logger] wrote signal {sid} to {path}")
+    return sid
 
 
 def now_ts():
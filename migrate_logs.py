@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# migrate_logs.py
+# Stream the old CSV logs into the journal (journal.py) chunk by chunk.
+# Understands every layout that has been written to trades_log.csv:
+#   - paper_trader rows      ts,ticker,side,entry_spot,tp_spot,sl_spot,shares,contracts,risk_per_share,max_loss,status
+#   - ... closed by the old trade_closer (+ close_ts,close_spot,reason,realized_pnl)
+#   - monitor triggers       timestamp_utc,symbol,side,last,entry,stop,target,units,rr
+#   - monitor events         + event,pnl_dollars,pnl_pct,hold_minutes (OPEN / CLOSE_STOP / CLOSE_TARGET)
+# and signals_log.csv. Rows are classified one by one (files that mix layouts
+# are fine), and progress is checkpointed per file so a re-run only imports
+# rows appended since the last one.
+#
+# Run:
+#   python migrate_logs.py                                 # trades_log*.csv + signals_log.csv
+#   python migrate_logs.py old/trades_log.csv --chunksize 20000
+
+import argparse, csv, time
+from pathlib import Path
+from typing import Dict, List, Optional
+from journal import Journal, JOURNAL_PATH, TradeRecord
+
+PAPER = ["ts","ticker","side","entry_spot","tp_spot","sl_spot","shares","contracts",
+         "risk_per_share","max_loss","status"]
+PAPER_CLOSED = PAPER + ["close_ts","close_spot","reason","realized_pnl"]
+MONITOR = ["timestamp_utc","symbol","side","last","entry","stop","target","units","rr"]
+MONITOR_EVENTS = ["timestamp_utc","event","symbol","side","last","entry","stop","target",
+                  "units","rr","pnl_dollars","pnl_pct","hold_minutes"]
+SIGNALS = ["ts","ticker","bias","spot","tp_spot","sl_spot","q_lo","q_md","q_hi","sigma",
+           "shares","risk_per_share","max_loss","contracts","max_spend"]
+LAYOUTS = [PAPER, PAPER_CLOSED, MONITOR, MONITOR_EVENTS]
+REASONS = {"CLOSE_STOP": "SL", "CLOSE_TARGET": "TP"}
+
+DEFAULT_FILES = ["trades_log.legacy.csv", "trades_log.csv", "signals_log.csv"]
+
+# ---------- row mapping ----------
+
+def layout_for(row: List[str], header: List[str]) -> Optional[List[str]]:
+    """The file's own header when the row fits it, else the known layout of that width."""
+    if len(row) == len(header):
+        return header
+    return next((l for l in LAYOUTS if len(l) == len(row)), None)
+
+def monitor_trade(r: Dict[str, str]) -> TradeRecord:
+    return TradeRecord(ts=r["timestamp_utc"], ticker=r["symbol"], side=r.get("side") or "LONG",
+                       status="OPEN", source="monitor", entry_spot=r["last"],
+                       entry_level=r["entry"], tp_spot=r["target"], sl_spot=r["stop"],
+                       shares=r.get("units"), rr=r.get("rr"))
+
+def close_fields(r: Dict[str, str]) -> dict:
+    return {"status": "CLOSED", "close_ts": r["timestamp_utc"], "close_spot": r["last"],
+            "reason": REASONS.get(r["event"], r["event"]), "realized_pnl": r.get("pnl_dollars"),
+            "pnl_pct": r.get("pnl_pct"), "hold_minutes": r.get("hold_minutes")}
+
+# ---------- migration ----------
+
+def _chunks(reader, size: int):
+    chunk = []
+    for row in reader:
+        if row:
+            chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _apply_trades(j: Journal, rows: List[Dict[str, str]]) -> int:
+    """Insert trades in bulk; monitor CLOSE_* events close their OPEN trade in place."""
+    out, n = [], 0
+    for r in rows:
+        event = (r.get("event") or "").upper()
+        if not event.startswith("CLOSE"):
+            out.append(monitor_trade(r) if "symbol" in r
+                       else TradeRecord.from_row({"source": "paper", **r}))
+            continue
+        n += j.add_trades(out)  # keep order: the OPEN must be in the journal first
+        out = []
+        rec = monitor_trade(r)
+        hit = j.conn.execute(
+            "SELECT id FROM trades WHERE status = 'OPEN' AND source = 'monitor' AND ticker = ? "
+            "AND entry_level = ? ORDER BY id DESC LIMIT 1", (rec.ticker, rec.entry_level)).fetchone()
+        if hit:
+            j.update_trade(hit[0], **close_fields(r))
+        else:  # the OPEN row was lost; keep the close as a complete trade
+            j.add_trade({**rec.as_row(), **close_fields(r)})
+            n += 1
+    return n + j.add_trades(out)
+
+def migrate_file(j: Journal, path: Path, chunksize: int = 5000) -> dict:
+    """Import one CSV log, resuming after the rows a previous run already imported."""
+    key = str(path.resolve())
+    done = j.conn.execute("SELECT rows FROM imports WHERE path = ?", (key,)).fetchone()
+    done = done[0] if done else 0
+    stats = {"file": path.name, "rows": 0, "inserted": 0, "skipped": 0}
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader, [])]
+        is_signals = "bias" in header
+        seen = 0
+        for chunk in _chunks(reader, chunksize):
+            start, seen = seen, seen + len(chunk)
+            if seen <= done:
+                continue
+            chunk = chunk[max(0, done - start):]
+            rows = []
+            for raw in chunk:
+                cols = SIGNALS if is_signals and len(raw) == len(SIGNALS) else layout_for(raw, header)
+                if cols is None:
+                    stats["skipped"] += 1
+                    continue
+                rows.append(dict(zip(cols, raw)))
+            stats["inserted"] += j.add_signals(rows) if is_signals else _apply_trades(j, rows)
+            stats["rows"] += len(chunk)
+            with j.conn:
+                j.conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?)",
+                               (key, seen, time.strftime("%Y-%m-%d %H:%M:%S")))
+    return stats
+
+def main():
+    ap = argparse.ArgumentParser(description="Import old CSV trade/signal logs into the journal")
+    ap.add_argument("files", nargs="*", default=None)
+    ap.add_argument("--db", default=JOURNAL_PATH)
+    ap.add_argument("--chunksize", type=int, default=5000)
+    args = ap.parse_args()
+
+    files = [Path(p) for p in (args.files or DEFAULT_FILES) if Path(p).exists()]
+    if not files:
+        raise SystemExit("No CSV logs to migrate.")
+    with Journal(args.db) as j:
+        for p in files:
+            s = migrate_file(j, p, args.chunksize)
+            print(f"{s['file']}: {s['rows']} new rows, {s['inserted']} inserted, {s['skipped']} unrecognized")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# model_cache.py
+# On-disk cache of fitted models keyed by a fingerprint of the training data,
+# quantiles and model hyperparameters. Entries are joblib files; the least
+# recently used ones are evicted once the cache grows past max_bytes, and
+# *.tmp files left by interrupted writes are removed once they are stale.
+# Several processes may share the cache, so files can vanish at any point.
+
+import os, hashlib, json, tempfile, time
+from pathlib import Path
+import joblib
+import pandas as pd
+import sklearn
+
+CACHE_DIR = Path(__file__).resolve().parent / "data" / "model_cache"
+MAX_BYTES = 512 * 1024 * 1024
+TMP_MAX_AGE = 3600.0  # seconds; younger *.tmp files may still be written by another put()
+
+def _hash_frame(h, obj):
+    h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    if isinstance(obj, pd.DataFrame):
+        h.update(json.dumps([str(c) for c in obj.columns]).encode())
+
+def fingerprint(X_train, y_train, quantiles, params: dict) -> str:
+    """Hash of the training slice, quantiles and model params (plus sklearn version)."""
+    h = hashlib.sha256()
+    _hash_frame(h, X_train)
+    _hash_frame(h, pd.Series(y_train))
+    h.update(json.dumps({"quantiles": [float(q) for q in quantiles], "params": params,
+                         "sklearn": sklearn.__version__}, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+class ModelCache:
+    """LRU-by-size cache of fitted models (one joblib file per key)."""
+
+    def __init__(self, root=CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.joblib"
+
+    def get(self, key: str):
+        p = self._path(key)
+        if not p.exists():
+            return None
+        try:
+            obj = joblib.load(p)
+        except Exception:
+            return None
+        os.utime(p)  # mark as recently used
+        return obj
+
+    def put(self, key: str, obj):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        joblib.dump(obj, tmp)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Drop stale *.tmp leftovers, then least recently used entries until the cache fits in max_bytes."""
+        now = time.time()
+        entries = []
+        for p in self.root.glob("*"):
+            if p.suffix not in (".joblib", ".tmp"):
+                continue
+            try:
+                st = p.stat()
+                if p.suffix == ".tmp":
+                    if now - st.st_mtime > TMP_MAX_AGE:
+                        p.unlink()
+                    continue
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+def default_cache() -> ModelCache:
+    return ModelCache()
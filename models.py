@@ -1,23 +1,80 @@
+import os
 import numpy as np
-from sklearn.ensemble import GradientBoostingRegressor
+from joblib import Parallel, delayed
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor
 from sklearn.linear_model import Ridge
+from model_cache import fingerprint
 
-def _q_model(alpha: float):
-    return GradientBoostingRegressor(
-        loss="quantile",
-        alpha=alpha,
-        n_estimators=400,
-        max_depth=3,
-        subsample=0.8,
-        random_state=42,
-    )
+# "gbr": the original GradientBoostingRegressor per quantile
+# "hgb": histogram gradient boosting with quantile loss (much faster on long series)
+BACKENDS = ("gbr", "hgb")
+
+def _q_model(alpha: float, backend: str = "gbr", overrides=None):
+    """Quantile model for alpha; overrides (e.g. tuned params) replace the defaults below."""
+    m = _default_q_model(alpha, backend)
+    return m.set_params(**overrides) if overrides else m
+
+def _default_q_model(alpha: float, backend: str):
+    if backend == "gbr":
+        return GradientBoostingRegressor(
+            loss="quantile",
+            alpha=alpha,
+            n_estimators=400,
+            max_depth=3,
+            subsample=0.8,
+            random_state=42,
+        )
+    if backend == "hgb":
+        return HistGradientBoostingRegressor(
+            loss="quantile",
+            quantile=alpha,
+            max_iter=400,
+            max_depth=3,
+            learning_rate=0.1,
+            early_stopping=False,
+            random_state=42,
+        )
+    raise ValueError(f"unknown model backend: {backend} (choose from {BACKENDS})")
 
 def _mu_model():
     return Ridge(alpha=1.0)
 
-def fit_models(X_train, y_train, quantiles=(0.15, 0.5, 0.85)):
-    q_models = {q: _q_model(q).fit(X_train, y_train) for q in quantiles}
+def model_params(quantiles, backend="gbr", params=None) -> dict:
+    """Hyperparameters of every model fit_models would train (used as a cache key)."""
+    params = params or {}
+    return {
+        "backend": backend,
+        "q": {str(q): _q_model(q, backend, params.get(q)).get_params() for q in quantiles},
+        "mu": _mu_model().get_params(),
+    }
+
+def fit_models(X_train, y_train, quantiles=(0.15, 0.5, 0.85), backend="gbr", n_jobs=-1,
+               cache=None, params=None):
+    """
+    Fit one quantile model per q plus the Ridge mean model.
+    The quantile fits are independent and run on n_jobs threads (1 = serial; -1 =
+    one per quantile, never more than the cores). Inside process-pool workers pass
+    n_jobs=1, or every worker starts its own threads on top of the pool.
+    With a model_cache.ModelCache, identical data + params return the stored models.
+    params: optional {q: {param: value}} overrides per quantile (see tuning.py).
+    """
+    params = params or {}
+    key = None
+    if cache is not None:
+        key = fingerprint(X_train, y_train, quantiles, model_params(quantiles, backend, params))
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    n_jobs = n_jobs or 1
+    n_jobs = min(len(quantiles), n_jobs if n_jobs > 0 else (os.cpu_count() or 1))
+    fitted = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_q_model(q, backend, params.get(q)).fit)(X_train, y_train) for q in quantiles
+    )
+    q_models = dict(zip(quantiles, fitted))
     mu = _mu_model().fit(X_train, y_train)
+    if key is not None:
+        cache.put(key, (q_models, mu))
     return q_models, mu
 
 def predict_dist(q_models, mu, X):
@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 # monitor_entries.py
 # Fast batch monitor: reads daily_watchlist.json, fetches prices in bulk,
-# triggers when entry is crossed (with buffer), logs CSV, optional Telegram alerts.
+# triggers when entry is crossed (with buffer), then tracks the open position
+# until its stop or target is hit. Each position is one trade row in the
+# journal (journal.py): inserted OPEN on entry, closed by id with P&L on exit.
+# Optional Telegram alerts.
+# --stream evaluates triggers on every pushed tick; polling is the fallback.
+# Polls are async: the batch request and the per-symbol fallbacks run side by
+# side with a per-request deadline and bounded concurrency, and alerts go out
+# from a background queue so a slow symbol or Telegram never stalls the loop.
 
-import os, json, time, argparse, csv
+import os, json, time, argparse, asyncio, threading, queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 import pandas as pd
 import yfinance as yf
 import requests
+from triggers import Idea, TriggerIndex
+from journal import Journal
 
 def utcnow():
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
@@ -25,12 +35,40 @@ def send_telegram(msg: str):
     except Exception:
         pass
 
-def batch_last_prices(symbols):
-    """Fetch last prices for a list of symbols."""
-    out = {}
-    if not symbols:
-        return out
-    try:
+class AlertQueue:
+    """Send alerts from a daemon thread so the poll loop never waits on the network."""
+
+    def __init__(self, send=send_telegram):
+        self.send = send
+        self.q = queue.Queue()
+        self.t = threading.Thread(target=self._worker, daemon=True)
+        self.t.start()
+
+    def _worker(self):
+        while True:
+            msg = self.q.get()
+            if msg is None:
+                return
+            try:
+                self.send(msg)
+            except Exception:
+                pass
+
+    def put(self, msg: str):
+        self.q.put(msg)
+
+    def close(self, timeout: float = 10.0):
+        """Flush pending alerts (up to timeout seconds) and stop the worker."""
+        self.q.put(None)
+        self.t.join(timeout)
+
+# ---------- quote sources ----------
+
+class YFQuoteSource:
+    """Last prices from Yahoo: one multi-ticker 1m download plus per-symbol history fallback."""
+
+    def batch(self, symbols):
+        out = {}
         df = yf.download(
             tickers=" ".join(symbols),
             period="1d",
@@ -45,31 +83,311 @@ def batch_last_prices(symbols):
                 out[str(sym)] = float(close[sym])
         else:
             out[symbols[0]] = float(df["Close"].iloc[-1])
-    except Exception:
-        pass
+        return out
+
+    def one(self, symbol):
+        t = yf.Ticker(symbol)
+        h = t.history(period="1d", interval="1m")
+        if h is None or h.empty:
+            h = t.history(period="5d", interval="1d")
+        if h is not None and not h.empty:
+            return float(h["Close"].iloc[-1])
+        return None
+
+class HttpQuoteSource:
+    """
+    JSON quote endpoint (e.g. a local fake quote server for tests):
+      GET <url>/quotes?symbols=A,B  -> {"A": 1.0, "B": 2.0}
+      GET <url>/quote/<SYMBOL>      -> {"price": 1.0}
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def batch(self, symbols):
+        r = requests.get(f"{self.url}/quotes", params={"symbols": ",".join(symbols)}, timeout=self.timeout)
+        r.raise_for_status()
+        return {str(k): float(v) for k, v in r.json().items() if v is not None}
+
+    def one(self, symbol):
+        r = requests.get(f"{self.url}/quote/{symbol}", timeout=self.timeout)
+        r.raise_for_status()
+        price = r.json().get("price")
+        return None if price is None else float(price)
+
+# ---------- async polling ----------
+
+class QuotePool:
+    """
+    Threads for blocking quote fetches. A fetch that misses its deadline is
+    cancelled if it has not started; one already running keeps its thread until
+    the request returns (Python cannot stop it), so it is counted as stuck and,
+    while max_stuck are stuck, new fetches are skipped instead of queueing
+    behind them. The pool has room for `concurrency` live fetches besides those.
+    """
 
-    # fallback for any missing
-    missing = [s for s in symbols if s not in out]
-    for s in missing:
+    def __init__(self, concurrency: int = 16, max_stuck: int = None):
+        self.max_stuck = concurrency if max_stuck is None else max_stuck
+        self.ex = ThreadPoolExecutor(max_workers=concurrency + 1 + self.max_stuck)
+        self.stuck = set()
+        self.lock = threading.Lock()
+
+    def _abandon(self, fut):
+        if fut.cancel():
+            return
+        with self.lock:
+            self.stuck.add(fut)
+        fut.add_done_callback(self._release)
+
+    def _release(self, fut):
+        with self.lock:
+            self.stuck.discard(fut)
+
+    async def call(self, deadline, fn, *args):
+        """fn(*args) in a worker; None on error, when it misses the deadline, or when the pool is jammed."""
+        with self.lock:
+            if len(self.stuck) >= self.max_stuck:
+                return None
+        fut = self.ex.submit(fn, *args)
         try:
-            t = yf.Ticker(s)
-            h = t.history(period="1d", interval="1m")
-            if h is None or h.empty:
-                h = t.history(period="5d", interval="1d")
-            if h is not None and not h.empty:
-                out[s] = float(h["Close"].iloc[-1])
+            return await asyncio.wait_for(asyncio.wrap_future(fut), deadline)
+        except asyncio.CancelledError:
+            self._abandon(fut)
+            raise
+        except asyncio.TimeoutError:
+            self._abandon(fut)
+            return None
         except Exception:
-            pass
-    return out
+            return None
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--interval", type=int, default=10,
-                    help="Minutes between polls (0 = run once)")
-    ap.add_argument("--buffer-bps", type=float, default=10.0,
-                    help="Entry buffer in basis points (0.1% = 10)")
-    args = ap.parse_args()
+    def shutdown(self):
+        self.ex.shutdown(wait=False, cancel_futures=True)
+
+async def poll_prices(symbols, source=None, deadline: float = 8.0, concurrency: int = 16,
+                      pool: QuotePool = None):
+    """
+    Last prices for symbols. The batch request and the per-symbol fallbacks start
+    together (at most `concurrency` fallbacks in flight), each bounded by
+    `deadline` seconds. Fallbacks for symbols the batch returned are dropped as
+    soon as it lands; if every fallback finishes first the batch is abandoned.
+    A poll therefore waits for the slowest single request, not batch + fallback.
+    """
+    if not symbols:
+        return {}
+    source = source or YFQuoteSource()
+    own_pool = pool is None
+    pool = pool or QuotePool(concurrency)
+    sem = asyncio.Semaphore(concurrency)
+    batch = asyncio.ensure_future(pool.call(deadline, source.batch, list(symbols)))
+
+    async def one(sym):
+        async with sem:
+            if batch.done() and sym in (batch.result() or {}):
+                return None
+            return await pool.call(deadline, source.one, sym)
+
+    try:
+        singles = {s: asyncio.ensure_future(one(s)) for s in symbols}
+        rest = asyncio.gather(*singles.values(), return_exceptions=True)
+        await asyncio.wait([batch, rest], return_when=asyncio.FIRST_COMPLETED)
+        out = {}
+        if batch.done():
+            out = batch.result() or {}
+            for s in out:
+                if s in singles:
+                    singles[s].cancel()
+        else:
+            batch.cancel()
+        got = await rest
+        out.update({s: p for s, p in zip(singles, got)
+                    if s not in out and p is not None and not isinstance(p, BaseException)})
+        return out
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+def batch_last_prices(symbols, source=None, deadline: float = 8.0, concurrency: int = 16):
+    """Fetch last prices for a list of symbols."""
+    return asyncio.run(poll_prices(symbols, source, deadline, concurrency))
+
+# ---------- streams ----------
+
+class ReplayStream:
+    """
+    Replay ticks from a CSV (timestamp,symbol,price). speed=0 replays as fast as
+    possible; speed=1 keeps the original spacing, speed=10 is 10x faster.
+    Yields (symbol, price, tick time).
+    """
 
+    def __init__(self, path: str, speed: float = 0.0):
+        self.path = path
+        self.speed = speed
+
+    async def __aiter__(self):
+        df = pd.read_csv(self.path)
+        ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce") if "timestamp" in df.columns else None
+        prev = None
+        for n, (sym, price) in enumerate(zip(df["symbol"].astype(str), df["price"].astype(float))):
+            t = ts[n].to_pydatetime() if ts is not None and pd.notna(ts[n]) else None
+            if self.speed and t is not None and prev is not None:
+                await asyncio.sleep(max(0.0, (t - prev).total_seconds() / self.speed))
+            if t is not None:
+                prev = t
+            yield sym, price, t or datetime.now(timezone.utc)
+
+class WebSocketStream:
+    """
+    Quotes pushed over a websocket as JSON: {"symbol": "AAPL", "price": 1.0}
+    or a list of such objects. On connect, {"subscribe": [symbols]} is sent.
+    Yields (symbol, price, receive time).
+    """
+
+    def __init__(self, url: str, symbols):
+        self.url = url
+        self.symbols = list(symbols)
+
+    async def __aiter__(self):
+        import websockets  # optional dependency, only needed for --stream ws://...
+        async with websockets.connect(self.url) as ws:
+            await ws.send(json.dumps({"subscribe": self.symbols}))
+            async for raw in ws:
+                msg = json.loads(raw)
+                for q in (msg if isinstance(msg, list) else [msg]):
+                    if q.get("symbol") is not None and q.get("price") is not None:
+                        yield str(q["symbol"]), float(q["price"]), datetime.now(timezone.utc)
+
+def open_stream(spec: str, symbols):
+    """--stream spec: replay:<ticks.csv>[@speed] or ws://host:port/path."""
+    if spec.startswith(("ws://", "wss://")):
+        return WebSocketStream(spec, symbols)
+    if spec.startswith("replay:"):
+        path, _, speed = spec[len("replay:"):].partition("@")
+        return ReplayStream(path, float(speed or 0))
+    raise ValueError(f"unknown stream: {spec}")
+
+# ---------- monitor ----------
+
+POSITIONS_PATH = "positions.json"
+REASONS = {"STOP": "SL", "TARGET": "TP"}  # trade_closer's reason codes
+
+class Position:
+    __slots__ = ("idea", "fill", "opened", "trade_id")
+
+    def __init__(self, idea: Idea, fill: float, opened: datetime, trade_id=None):
+        self.idea = idea
+        self.fill = fill
+        self.opened = opened
+        self.trade_id = trade_id
+
+class PositionBook:
+    """
+    Live long positions opened by entry triggers, persisted to positions.json
+    (read by the dashboard's Open Positions tab) so a restart keeps them.
+    """
+
+    def __init__(self, path: str = POSITIONS_PATH):
+        self.path = path
+        self.open: dict = {}
+
+    def restore(self, index: TriggerIndex):
+        """Reload saved positions and re-arm their saved stop/target levels in the index."""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f).get("positions", [])
+        except Exception:
+            return
+        for p in saved:
+            try:
+                idea = index.restore(p)
+                self.open[idea.key] = Position(idea, float(p["fill"]),
+                                               datetime.fromisoformat(p["opened_utc"]),
+                                               p.get("trade_id"))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping unreadable saved position {p}: {e!r}")
+        if self.open:
+            print(f"Restored {len(self.open)} open positions from {self.path}")
+
+    def save(self):
+        rows = [{"symbol": p.idea.symbol, "side": "long", "entry": p.idea.entry, "fill": p.fill,
+                 "stop": p.idea.stop, "target": p.idea.target, "units": p.idea.units,
+                 "opened_utc": p.opened.isoformat(timespec="seconds"), "trade_id": p.trade_id}
+                for p in self.open.values()]
+        with open(self.path, "w") as f:
+            json.dump({"updated_at_utc": utcnow(), "positions": rows}, f, indent=2)
+
+    def add(self, idea: Idea, fill: float, ts: datetime, trade_id=None) -> Position:
+        pos = self.open[idea.key] = Position(idea, fill, ts, trade_id)
+        self.save()
+        return pos
+
+    def close(self, idea: Idea):
+        pos = self.open.pop(idea.key, None)
+        self.save()
+        return pos
+
+def on_entry(idea: Idea, last: float, ts: datetime, index: TriggerIndex, book: PositionBook,
+             journal: Journal, alerts):
+    """Journal, alert and open a long position for a crossed entry; arm its exits."""
+    msg = (f"TRIGGER {idea.symbol} @ {round(last,5)} | Side: long\n"
+           f"Entry {idea.entry} | Stop {idea.stop} | Target {idea.target} | "
+           f"R:R ~ {round(idea.rr,2)} | Units {idea.units}")
+    print("="*54)
+    print(msg)
+    print("="*54)
+
+    trade_id = journal.add_trade({
+        "ts": ts, "ticker": idea.symbol, "side": "LONG", "status": "OPEN", "source": "monitor",
+        "entry_spot": round(last,5), "entry_level": idea.entry, "tp_spot": idea.target, "sl_spot": idea.stop,
+        "shares": int(idea.units or 0), "rr": round(idea.rr,2)})
+    book.add(idea, last, ts, trade_id)
+    index.arm(idea)
+    alerts.put(msg)
+
+def on_exit(idea: Idea, reason: str, last: float, ts: datetime, book: PositionBook,
+            journal: Journal, alerts):
+    """Close the position at the observed price and record the exit with P&L on its trade."""
+    pos = book.close(idea)
+    fill = pos.fill if pos else idea.entry
+    units = float(idea.units or 0)
+    pnl = (last - fill) * units
+    pnl_pct = (last / fill - 1) * 100 if fill else 0.0
+    hold = (ts - pos.opened).total_seconds() / 60 if pos else 0.0
+    msg = (f"CLOSE {idea.symbol} ({reason}) @ {round(last,5)} | Fill {round(fill,5)} | "
+           f"P&L ${pnl:.2f} ({pnl_pct:.2f}%) | Held {hold:.0f} min")
+    print(msg)
+    close = {"status": "CLOSED", "close_ts": ts, "close_spot": round(last,5),
+             "reason": REASONS[reason], "realized_pnl": round(pnl,2),
+             "pnl_pct": round(pnl_pct,3), "hold_minutes": round(hold,1)}
+    if pos is not None and pos.trade_id is not None:
+        journal.update_trade(pos.trade_id, **close)
+    else:  # position opened before the journal existed
+        journal.add_trade({"ts": pos.opened if pos else ts, "ticker": idea.symbol, "side": "LONG",
+                           "source": "monitor", "entry_spot": round(fill,5),
+                           "entry_level": idea.entry, "tp_spot": idea.target,
+                           "sl_spot": idea.stop, "shares": int(idea.units or 0),
+                           "rr": round(idea.rr,2), **close})
+    alerts.put(msg)
+
+def on_price(sym: str, last: float, ts: datetime, index: TriggerIndex, book: PositionBook,
+             journal: Journal, alerts):
+    """Exits for open positions first, then new entries (which are armed from the next tick)."""
+    for idea, reason in index.exits(sym, last):
+        on_exit(idea, reason, last, ts, book, journal, alerts)
+    for idea in index.update(sym, last):
+        on_entry(idea, last, ts, index, book, journal, alerts)
+
+async def run_stream(stream, index: TriggerIndex, book: PositionBook, journal: Journal, alerts):
+    """Evaluate every tick; returns when the stream ends or nothing is left to watch."""
+    ticks = 0
+    async for sym, price, ts in stream:
+        ticks += 1
+        on_price(sym, price, ts, index, book, journal, alerts)
+        if not len(index):
+            break
+    print(f"[{utcnow()}] stream closed after {ticks} ticks")
+
+async def run(args):
     try:
         with open("daily_watchlist.json", "r") as f:
             payload = json.load(f)
@@ -84,63 +402,72 @@ def main():
 
     symbols = sorted({i["symbol"] for i in ideas})
     buf = args.buffer_bps / 10000.0
+    source = HttpQuoteSource(args.quotes_url, timeout=args.deadline) if args.quotes_url else YFQuoteSource()
+    pool = QuotePool(args.concurrency)
+    alerts = AlertQueue()
+    index = TriggerIndex(ideas, buffer=buf)
+    book = PositionBook()
+    book.restore(index)
+    journal = Journal()
 
-    print(f"Loaded {len(ideas)} ideas across {len(symbols)} symbols. "
-          f"Checking every {args.interval} minutes.\n")
-
-    # Prepare CSV log
-    log_path = "trades_log.csv"
-    if not os.path.exists(log_path):
-        with open(log_path, "w", newline="") as f:
-            csv.writer(f).writerow(
-                ["timestamp_utc", "symbol", "side", "last", "entry", "stop",
-                 "target", "units", "rr"]
-            )
-
-    triggered = set()
-    while True:
-        print(f"[{utcnow()}] polling...")
-        last_map = batch_last_prices(symbols)
-
-        for idea in ideas:
-            key = f"{idea['symbol']}:{idea.get('entry')}"
-            if key in triggered:
-                continue
-            sym = idea["symbol"]
-            if sym not in last_map:
-                continue
-
-            last = float(last_map[sym])
-            entry = float(idea["entry"])
-            stop = float(idea["stop"])
-            target = float(idea["target"])
-
-            # Long-only triggers
-            if last >= entry * (1 + buf):
-                rr = abs(target - entry) / max(abs(entry - stop), 1e-6)
-                msg = (f"TRIGGER {sym} @ {round(last,5)} | Side: long\n"
-                       f"Entry {entry} | Stop {stop} | Target {target} | "
-                       f"R:R ~ {round(rr,2)} | Units {idea.get('units',0)}")
-                print("="*54)
-                print(msg)
-                print("="*54)
-
-                with open(log_path, "a", newline="") as f:
-                    csv.writer(f).writerow(
-                        [utcnow(), sym, "long", round(last,5), entry, stop,
-                         target, idea.get("units",0), round(rr,2)]
-                    )
-
-                send_telegram(msg)
-                triggered.add(key)
-
-        if args.interval <= 0:
-            break
-        try:
-            time.sleep(max(10, args.interval * 60))
-        except KeyboardInterrupt:
-            print("\nStopping monitor.")
-            break
+    try:
+        if args.stream:
+            print(f"Loaded {len(ideas)} ideas across {len(symbols)} symbols. "
+                  f"Streaming from {args.stream}.\n")
+            try:
+                await run_stream(open_stream(args.stream, symbols), index, book, journal, alerts)
+            except Exception as e:
+                print(f"[stream] {e!r}; falling back to polling")
+            if not len(index) or args.interval <= 0:
+                return
+
+        print(f"Loaded {len(ideas)} ideas across {len(symbols)} symbols. "
+              f"Checking every {args.interval} minutes.\n")
+
+        while True:
+            print(f"[{utcnow()}] polling...")
+            t0 = time.perf_counter()
+            last_map = await poll_prices(index.symbols, source, args.deadline, args.concurrency, pool)
+            print(f"  got {len(last_map)}/{len(index.symbols)} prices in {time.perf_counter() - t0:.1f}s")
+
+            # Long-only: entry when last >= entry * (1 + buffer), then stop/target exits
+            now = datetime.now(timezone.utc)
+            for sym, last in last_map.items():
+                on_price(sym, float(last), now, index, book, journal, alerts)
+
+            if not len(index):
+                print("All ideas triggered and closed.")
+                break
+            if args.interval <= 0:
+                break
+            await asyncio.sleep(max(10, args.interval * 60))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nStopping monitor.")
+    finally:
+        alerts.close()
+        journal.close()
+        pool.shutdown()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--interval", type=int, default=10,
+                    help="Minutes between polls (0 = run once)")
+    ap.add_argument("--buffer-bps", type=float, default=10.0,
+                    help="Entry buffer in basis points (0.1% = 10)")
+    ap.add_argument("--deadline", type=float, default=8.0,
+                    help="Seconds allowed per price request")
+    ap.add_argument("--concurrency", type=int, default=16,
+                    help="Max price requests in flight")
+    ap.add_argument("--quotes-url", default=None,
+                    help="Read prices from a JSON quote endpoint instead of Yahoo")
+    ap.add_argument("--stream", default=None,
+                    help="Tick stream: ws://host:port/path or replay:ticks.csv[@speed] "
+                         "(polling resumes if the stream fails)")
+    args = ap.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
 
 if __name__ == "__main__":
     main()
@@ -12,48 +12,16 @@ import argparse
 import math
 from typing import List, Dict, Any, Tuple
 import pandas as pd
-import yfinance as yf
+from bar_store import default_store
+from indicators import compute_plans
 
-# ---------- indicators ----------
-
-def rsi14(close: pd.Series) -> pd.Series:
-    d = close.diff()
-    up = d.clip(lower=0).rolling(14).mean()
-    dn = (-d.clip(upper=0)).rolling(14).mean()
-    rs = up / dn
-    return 100 - 100 / (1 + rs)
-
-def atr14(h: pd.Series, l: pd.Series, c: pd.Series) -> pd.Series:
-    hl = h - l
-    hc = (h - c.shift()).abs()
-    lc = (l - c.shift()).abs()
-    tr = pd.concat([hl, hc, lc], axis=1).max(axis=1)
-    return tr.rolling(14).mean()
+# ---------- plans ----------
 
 def compute_plan(symbol: str, period: str="1y", interval: str="1d",
-                 account: float=500.0, risk_dollars: float=10.0) -> Dict[str, Any]:
-    df = yf.download(symbol, period=period, interval=interval, auto_adjust=True, progress=False, group_by="column")
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    if df.empty:
-        return {"symbol": symbol, "error": "no data"}
-    df = df.rename(columns=str.lower).reset_index()
-    for c in ["open","high","low","close","volume"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    df["rsi14"] = rsi14(df["close"])
-    df["atr14"] = atr14(df["high"], df["low"], df["close"])
-    df = df.dropna()
-    if df.empty:
-        return {"symbol": symbol, "error": "insufficient data"}
-    r = df.iloc[-1]
-    entry = float(r["close"]); atr = float(r["atr14"])
-    stop = float(entry - 1.5*atr); target = float(entry + 3.0*atr)
-    per_unit = abs(entry - stop)
-    units = int(risk_dollars // per_unit) if per_unit > 0 else 0
-    return {
-        "symbol": symbol, "entry": round(entry,2), "stop": round(stop,2), "target": round(target,2),
-        "rsi": round(float(r["rsi14"]),2), "atr": round(atr,2), "units": units
-    }
+                 account: float=500.0, risk_dollars: float=10.0,
+                 bars: pd.DataFrame=None) -> Dict[str, Any]:
+    df = bars if bars is not None else default_store().get(symbol, period=period, interval=interval)
+    return {"symbol": symbol, **compute_plans({symbol: df}, risk_dollars)[symbol]}
 
 # ---------- movers (yahooquery) ----------
 
@@ -134,10 +102,9 @@ def main():
         print("No symbols provided. Use --auto or --symbols AAPL NVDA ...")
         return
 
-    rows = []
-    for sym in tickers:
-        plan = compute_plan(sym, account=args.equity, risk_dollars=args.risk)
-        rows.append(plan)
+    bars = default_store().get_many(tickers, period="1y", interval="1d")
+    plans = compute_plans(bars, args.risk)
+    rows = [{"symbol": sym, **plans[sym]} for sym in dict.fromkeys(tickers)]
 
     df = pd.DataFrame(rows)
     print(df.to_string(index=False))
@@ -1,6 +1,6 @@
-import os, csv, time
+import time
+from journal import Journal, JOURNAL_PATH, TradeRecord
 
-TRADES_PATH = "trades_log.csv"
 FIELDS = [
     "ts","ticker","side","entry_spot","tp_spot","sl_spot",
     "shares","contracts","risk_per_share","max_loss",
@@ -10,12 +10,8 @@ FIELDS = [
 def now_ts():
     return time.strftime("%Y-%m-%d %H:%M:%S")
 
-def open_trade(row: dict, path: str = TRADES_PATH):
-    os.makedirs(os.path.dirname(path), exist_ok=True) if os.path.dirname(path) else None
-    is_new = not os.path.exists(path)
-    with open(path, "a", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=FIELDS)
-        if is_new:
-            w.writeheader()
-        out = {k: row.get(k, "") for k in FIELDS}
-        w.writerow(out)
+def open_trade(row: dict, path: str = JOURNAL_PATH) -> int:
+    """Append a paper trade to the journal; returns its trade id."""
+    rec = TradeRecord(**{k: row.get(k) for k in FIELDS}, source=row.get("source", "paper"))
+    with Journal(path) as j:
+        return j.add_trade(rec)
@@ -1,93 +1,63 @@
 import sys
-import pandas as pd
-import yfinance as yf
+from pathlib import Path
 from labeling import add_labels
 from features import make_features
 from backtest import walk_forward
-
-ticker = sys.argv[1] if len(sys.argv) > 1 else "SPY"
-
-# 1) Download
-df = yf.download(ticker, period="2y", interval="1d", auto_adjust=False, progress=False)
-if df.empty:
-    raise SystemExit(f"No data for {ticker}")
-
-# 2) If MultiIndex (some yfinance versions), collapse to single-level
-if isinstance(df.columns, pd.MultiIndex):
-    # If one symbol level is present, drop it
-    for lvl in range(df.columns.nlevels - 1, -1, -1):
-        if len(df.columns.get_level_values(lvl).unique()) == 1:
-            df = df.droplevel(lvl, axis=1)
-            break
-    # If still MultiIndex, flatten
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = ["_".join([str(x) for x in tup if x is not None]).strip() for tup in df.columns]
-
-# 3) Normalize names to lowercase-with-underscores
-df = df.rename(columns=lambda c: str(c).strip().lower().replace(" ", "_"))
-
-# 4) Robustly pick required columns (handles weird names)
-def pick_column(candidates, exclude_substr=None):
-    cols = list(df.columns)
-    # prefer exact match
-    for cand in candidates:
-        if cand in cols:
-            return cand
-    # fallback: substring match
-    for cand in candidates:
-        for col in cols:
-            name = str(col)
-            if cand in name and not (exclude_substr and exclude_substr in name):
-                return col
-    return None
-
-open_col  = pick_column(["open"])
-high_col  = pick_column(["high"])
-low_col   = pick_column(["low"])
-# prefer 'close' over 'adj_close'
-close_col = pick_column(["close"], exclude_substr="adj")
-if not close_col:
-    close_col = pick_column(["close"])  # accept adj_close if needed
-vol_col   = pick_column(["volume","vol"])
-
-missing = [x for x in [open_col, high_col, low_col, close_col, vol_col] if x is None]
-if missing:
-    raise SystemExit(f"Could not identify columns. Got: {df.columns.tolist()}")
-
-# 5) Build our schema
-out = (
-    df[[open_col, high_col, low_col, close_col, vol_col]]
-    .copy()
-    .rename(columns={
-        open_col: "open",
-        high_col: "high",
-        low_col: "low",
-        close_col: "close",
-        vol_col: "volume",
-    })
-    .reset_index()
-)
-
-# Normalize datetime column
-if "date" in out.columns:
-    out = out.rename(columns={"date": "datetime"})
-elif "index" in out.columns:
-    out = out.rename(columns={"index": "datetime"})
-elif "datetime" not in out.columns:
-    out.rename(columns={out.columns[0]: "datetime"}, inplace=True)
-
-# 6) Force numeric and clean
-for c in ["open","high","low","close","volume"]:
-    out[c] = pd.to_numeric(out[c], errors="coerce")
-
-out = out.dropna(subset=["open","high","low","close","volume"]).set_index("datetime").sort_index()
-
-# 7) Labels → Features → Backtest
-df_l = add_labels(out, horizon=3, tp_sigma=0.8, sl_sigma=0.6, vol_lookback=5)
-df_f, X, y = make_features(df_l)
-bt = walk_forward(df_f, X, y, quantiles=(0.15, 0.5, 0.85), cost_bps=1.5, train_frac=0.7)
-
-# 8) Save artifacts for app
-out.reset_index().to_csv("data/prices.csv", index=False)
-bt.to_csv("backtest_results.csv")
-print(f"Refreshed {ticker}: {len(bt)} test rows, final_equity={bt.equity.iloc[-1]:.3f}, trades={(bt.signal!=0).sum()}")
+from model_cache import default_cache
+from bar_store import default_store
+from feature_store import default_feature_store
+from tuning import load_params
+
+ARTIFACTS = Path("artifacts")
+
+def artifact_dir(ticker: str) -> Path:
+    return ARTIFACTS / ticker.upper()
+
+def labelled(ticker: str, bars, feature_store=None):
+    """Labels + stored features for one ticker's bars -> (df_f, X, y)."""
+    feats = (feature_store or default_feature_store()).update(ticker, bars, interval="1d")
+    df_l = add_labels(bars, horizon=3, tp_sigma=0.8, sl_sigma=0.6, vol_lookback=5)
+    return make_features(df_l, feats)
+
+def refresh_ticker(ticker: str, bars=None, out_dir=None, feature_store=None, n_jobs=None) -> dict:
+    """
+    Bars → Labels → Features → Backtest for one ticker.
+    Writes <out_dir>/prices.csv and <out_dir>/backtest.csv (default artifacts/<TICKER>/).
+    n_jobs goes to walk_forward (1 inside a process-pool worker).
+    """
+    # 1) Bars via the local store (only the tail since the last run is downloaded)
+    out = bars if bars is not None else default_store(auto_adjust=False).get(ticker, period="2y", interval="1d")
+    if out is None or out.empty:
+        raise ValueError(f"No data for {ticker}")
+
+    # 2) Labels → Features (only bars new since the last run are computed) → Backtest
+    #    with the ticker's tuned model params when tuning.py has saved some
+    df_f, X, y = labelled(ticker, out, feature_store)
+    bt = walk_forward(df_f, X, y, quantiles=(0.15, 0.5, 0.85), cost_bps=1.5, train_frac=0.7,
+                      n_jobs=n_jobs, cache=default_cache(), params=load_params(ticker))
+
+    # 3) Save per-ticker artifacts
+    d = Path(out_dir) if out_dir else artifact_dir(ticker)
+    d.mkdir(parents=True, exist_ok=True)
+    out.reset_index().to_csv(d / "prices.csv", index=False)
+    bt.to_csv(d / "backtest.csv")
+    return {
+        "ticker": ticker,
+        "test_rows": len(bt),
+        "final_equity": round(float(bt.equity.iloc[-1]), 4),
+        "trades": int((bt.signal != 0).sum()),
+        "prices": out,
+        "backtest": bt,
+    }
+
+if __name__ == "__main__":
+    ticker = sys.argv[1] if len(sys.argv) > 1 else "SPY"
+    try:
+        res = refresh_ticker(ticker)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    # single-ticker artifacts the app and latest_signal.py read by default
+    res["prices"].reset_index().to_csv("data/prices.csv", index=False)
+    res["backtest"].to_csv("backtest_results.csv")
+    print(f"Refreshed {ticker}: {res['test_rows']} test rows, final_equity={res['final_equity']:.3f}, trades={res['trades']}")
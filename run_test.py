@@ -1,7 +1,10 @@
+import sys
 import pandas as pd
 from labeling import add_labels
 from features import make_features
-from backtest import walk_forward
+from feature_store import default_feature_store
+from backtest import walk_forward, summarize
+from model_cache import default_cache
 
 # 1) LOAD DATA (force numeric to avoid the string/NoneType error you saw)
 df = (
@@ -16,24 +19,21 @@ df = df.dropna(subset=["open","high","low","close","volume"])
 # 2) LABELS (short windows so we keep enough rows)
 df_l = add_labels(df, horizon=3, tp_sigma=0.8, sl_sigma=0.6, vol_lookback=5)
 
-# 3) FEATURES
-df_f, X, y = make_features(df_l)
+# 3) FEATURES (feature store key: the ticker refresh.py wrote to data/prices.csv;
+#    if the file now holds another series the stored features are rebuilt)
+symbol = sys.argv[1] if len(sys.argv) > 1 else "prices"
+feats = default_feature_store().update(symbol, df, interval="1d")
+df_f, X, y = make_features(df_l, feats)
 
 # 4) BACKTEST
-bt = walk_forward(df_f, X, y, quantiles=(0.15, 0.5, 0.85), cost_bps=1.5, train_frac=0.7)
+bt = walk_forward(df_f, X, y, quantiles=(0.15, 0.5, 0.85), cost_bps=1.5, train_frac=0.7,
+                  cache=default_cache())
 
 # 5) RESULTS
 print("Tail:")
 print(bt.tail(10))
 print("\nSummary:")
-print(
-    pd.DataFrame({
-        "trades": [(bt.signal != 0).sum()],
-        "avg_pnl": [bt.pnl.mean()],
-        "sharpe_like": [(bt.pnl.mean() / (bt.pnl.std() + 1e-9)) * (252**0.5)],
-        "final_equity": [bt.equity.iloc[-1]]
-    })
-)
+print(pd.DataFrame([summarize(bt)]))
 
 bt.to_csv("backtest_results.csv")
 print("\nSaved: backtest_results.csv")
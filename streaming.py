@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# streaming.py
+# O(1)-per-bar indicator state. Seed once from history, then update() bar by bar;
+# values match the batch pandas versions (rolling(n).mean()/std(), pct_change)
+# used in indicators.py and features.compute_features (test_streaming.py checks both).
+
+import math
+from collections import deque
+from typing import Dict, Any
+import pandas as pd
+
+NAN = float("nan")
+
+def _isnan(x) -> bool:
+    return x is None or x != x
+
+# ---------- rolling primitives ----------
+
+class RollingMean:
+    """rolling(n).mean(): running sum over a ring buffer; NaN until n valid values."""
+    __slots__ = ("n", "buf", "total", "nans")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.buf = deque(maxlen=n)
+        self.total = 0.0
+        self.nans = 0
+
+    def update(self, x: float) -> float:
+        if len(self.buf) == self.n:
+            old = self.buf[0]
+            if _isnan(old):
+                self.nans -= 1
+            else:
+                self.total -= old
+        self.buf.append(x)
+        if _isnan(x):
+            self.nans += 1
+        else:
+            self.total += x
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.buf) < self.n or self.nans:
+            return NAN
+        return self.total / self.n
+
+class RollingStd:
+    """rolling(n).std() (ddof=1) via Welford add/remove over a ring buffer."""
+    __slots__ = ("n", "buf", "mean", "m2", "count", "nans")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.buf = deque(maxlen=n)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.count = 0
+        self.nans = 0
+
+    def _add(self, x: float):
+        self.count += 1
+        d = x - self.mean
+        self.mean += d / self.count
+        self.m2 += d * (x - self.mean)
+
+    def _remove(self, x: float):
+        if self.count == 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        d = x - self.mean
+        self.count -= 1
+        self.mean -= d / self.count
+        self.m2 -= d * (x - self.mean)
+
+    def update(self, x: float) -> float:
+        if len(self.buf) == self.n:
+            old = self.buf[0]
+            if _isnan(old):
+                self.nans -= 1
+            else:
+                self._remove(old)
+        self.buf.append(x)
+        if _isnan(x):
+            self.nans += 1
+        else:
+            self._add(x)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.buf) < self.n or self.nans or self.count < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+class PctChange:
+    """Series.pct_change(n) for the latest value."""
+    __slots__ = ("n", "buf")
+
+    def __init__(self, n: int = 1):
+        self.n = n
+        self.buf = deque(maxlen=n + 1)
+
+    def update(self, x: float) -> float:
+        self.buf.append(x)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.buf) <= self.n:
+            return NAN
+        return self.buf[-1] / self.buf[0] - 1
+
+# ---------- indicators ----------
+
+class RSI:
+    """Streaming twin of indicators.rsi14 (SMA of gains / losses)."""
+    __slots__ = ("prev", "up", "dn", "value")
+
+    def __init__(self, n: int = 14):
+        self.prev = NAN
+        self.up = RollingMean(n)
+        self.dn = RollingMean(n)
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        d = close - self.prev if not _isnan(self.prev) else NAN
+        self.prev = close
+        up = self.up.update(NAN if _isnan(d) else max(d, 0.0))
+        dn = self.dn.update(NAN if _isnan(d) else max(-d, 0.0))
+        if _isnan(up) or _isnan(dn) or (up == 0 and dn == 0):
+            self.value = NAN
+        elif dn == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - 100 / (1 + up / dn)
+        return self.value
+
+class ATR:
+    """Streaming twin of indicators.atr14 (SMA of true range)."""
+    __slots__ = ("prev", "tr", "value")
+
+    def __init__(self, n: int = 14):
+        self.prev = NAN
+        self.tr = RollingMean(n)
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        parts = [high - low]
+        if not _isnan(self.prev):
+            parts += [abs(high - self.prev), abs(low - self.prev)]
+        parts = [p for p in parts if not _isnan(p)]
+        self.prev = close
+        self.value = self.tr.update(max(parts) if parts else NAN)
+        return self.value
+
+# ---------- composite states ----------
+
+class PlanState:
+    """
+    RSI14/ATR14 for one symbol, kept current bar by bar so a scanner or the
+    monitor can re-plan on every poll without touching history again.
+    """
+
+    def __init__(self, risk: float = 10.0, atr_floor: bool = False, fine_ticks: bool = False):
+        self.risk = risk
+        self.atr_floor = atr_floor
+        self.fine_ticks = fine_ticks
+        self.rsi = RSI()
+        self.atr = ATR()
+        self.close = NAN
+        self.last_ok = None  # (close, rsi, atr) from the last bar where both were valid
+
+    @classmethod
+    def seed(cls, df: pd.DataFrame, **kw) -> "PlanState":
+        st = cls(**kw)
+        for h, l, c in df[["high", "low", "close"]].itertuples(index=False):
+            st.update(h, l, c)
+        return st
+
+    def update(self, high: float, low: float, close: float):
+        r = self.rsi.update(close)
+        a = self.atr.update(high, low, close)
+        self.close = close
+        if not (_isnan(r) or _isnan(a)):
+            self.last_ok = (close, r, a)
+        return self
+
+    def plan(self) -> Dict[str, Any]:
+        """Same dict as indicators.compute_plans for this symbol."""
+        if self.last_ok is None:
+            return {"error": "insufficient data"}
+        price, r, a = (float(v) for v in self.last_ok)
+        if self.atr_floor:
+            a = max(a, max(0.01 * price, 0.001)) if price <= 1.0 else max(a, 0.0025 * price)
+        stop = price - 1.5 * a
+        target = price + 3.0 * a
+        per_unit = abs(price - stop)
+        nd = 5 if self.fine_ticks and price < 1 else 2
+        return {
+            "entry": round(price, nd),
+            "stop": round(stop, nd),
+            "target": round(target, nd),
+            "rsi": round(r, 2),
+            "atr": round(a, nd),
+            "units": int(self.risk // per_unit) if per_unit > 0 else 0,
+        }
+
+class FeatureState:
+    """Streaming twin of features.compute_features(FEATURE_COLS) for the latest bar."""
+
+    NAMES = ["r1", "r5", "r10", "ma5", "ma10", "vol5", "vol10", "hi_lo"]
+
+    def __init__(self):
+        self.r1 = PctChange(1)
+        self.r5 = PctChange(5)
+        self.r10 = PctChange(10)
+        self.ma5 = RollingMean(5)
+        self.ma10 = RollingMean(10)
+        self.vol5 = RollingStd(5)
+        self.vol10 = RollingStd(10)
+        self.values: Dict[str, float] = {k: NAN for k in self.NAMES}
+
+    @classmethod
+    def seed(cls, df: pd.DataFrame) -> "FeatureState":
+        st = cls()
+        for h, l, c in df[["high", "low", "close"]].itertuples(index=False):
+            st.update(h, l, c)
+        return st
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        r = self.r1.update(close)
+        self.values = {
+            "r1": r,
+            "r5": self.r5.update(close),
+            "r10": self.r10.update(close),
+            "ma5": self.ma5.update(close) / close - 1,
+            "ma10": self.ma10.update(close) / close - 1,
+            "vol5": self.vol5.update(r),
+            "vol10": self.vol10.update(r),
+            "hi_lo": (high - low) / close,
+        }
+        return self.values
+
+    @property
+    def ready(self) -> bool:
+        return not any(_isnan(v) for v in self.values.values())
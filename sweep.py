@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# sweep.py
+# Grid sweep over add_labels and walk_forward parameters for one price series.
+# Features are computed once and shared by every combination; the labelled
+# frame (rows, fwd_ret) only depends on (horizon, vol_lookback) and is built
+# once per pair. tp_sigma/sl_sigma only move the label column, which the
+# backtest does not read, so combinations that differ only there share one
+# backtest and get their own label mix (tp_% / sl_% / vert_%). Backtests run
+# in a process pool and the fitted models go through the model cache, so a
+# re-run (or a grid that repeats a training slice) skips training.
+# Output: one table ranked by the run_test.py summary metrics.
+#
+# Run:
+#   python sweep.py --horizon 3 5 10 --vol-lookback 5 20 --tp-sigma 0.8 1.0 --sl-sigma 0.6 0.8
+#   python sweep.py --ticker SPY --mode single rolling --cost-bps 1 1.5 3 --workers 8
+#   python sweep.py --prices data/prices.csv --rank-by final_equity --out sweep_results.csv
+
+import argparse, itertools, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+from labeling import add_labels, first_touch
+from features import compute_features, make_features
+from backtest import walk_forward, summarize
+from model_cache import default_cache
+
+METRICS = ["trades", "avg_pnl", "sharpe_like", "final_equity"]
+
+# ---------- data ----------
+
+def load_prices(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path, parse_dates=["datetime"]).set_index("datetime").sort_index()
+    for c in ["open","high","low","close","volume"]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df.dropna(subset=["open","high","low","close","volume"])
+
+def labelled_frames(bars: pd.DataFrame, feats: pd.DataFrame, pairs) -> dict:
+    """(horizon, vol_lookback) -> (df_f, X, y), built from the shared features."""
+    out = {}
+    for h, vl in pairs:
+        df_l = add_labels(bars, horizon=h, vol_lookback=vl)
+        out[(h, vl)] = make_features(df_l, feats)
+    return out
+
+def label_mix(bars: pd.DataFrame, rows: pd.Index, h: int, vl: int, tp: float, sl: float) -> dict:
+    """Share of TP / SL / vertical-barrier labels over the rows a backtest uses."""
+    sigma = bars["close"].pct_change().rolling(vl).std().shift(1)
+    label, _, _ = first_touch(bars["close"], bars["high"], bars["low"], sigma * tp, sigma * sl, h)
+    lab = pd.Series(label, index=bars.index).reindex(rows)
+    n = max(len(lab), 1)
+    return {"tp_%": round(100.0 * (lab == 1).sum() / n, 2),
+            "sl_%": round(100.0 * (lab == -1).sum() / n, 2),
+            "vert_%": round(100.0 * (lab == 0).sum() / n, 2)}
+
+# ---------- workers ----------
+
+_FRAMES = {}
+_CACHE = None
+
+def _init(frames, use_cache, one_thread=True):
+    """Pool initializer: every worker receives the labelled frames once."""
+    global _FRAMES, _CACHE
+    if one_thread:
+        threadpool_limits(1)  # one core per worker; the pool is the parallelism
+    _FRAMES = frames
+    _CACHE = default_cache() if use_cache else None
+
+def _run(label_key, wf):
+    """Worker: one backtest; returns metrics (errors are reported, not raised)."""
+    t0 = time.perf_counter()
+    try:
+        df_f, X, y = _FRAMES[label_key]
+        bt = walk_forward(df_f, X, y, quantiles=(0.15, 0.5, 0.85), n_jobs=1, cache=_CACHE, **wf)
+        row = {k: round(v, 6) for k, v in summarize(bt).items()}
+        row["test_rows"] = len(bt)
+    except Exception as e:
+        row = {"error": str(e)}
+    row["seconds"] = round(time.perf_counter() - t0, 2)
+    return label_key, tuple(wf.values()), row
+
+# ---------- sweep ----------
+
+def grid(**axes):
+    """Every combination of the given axes as a list of dicts."""
+    keys = list(axes)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(axes[k] for k in keys))]
+
+def sweep(bars, feats, label_grid, wf_grid, workers=None, use_cache=True, rank_by="sharpe_like"):
+    """
+    Run every (label params x walk_forward params) combination and return one
+    table ranked by rank_by (then final_equity), best first.
+    """
+    pairs = list(dict.fromkeys((p["horizon"], p["vol_lookback"]) for p in label_grid))
+    frames = labelled_frames(bars, feats, pairs)
+    jobs = [(pair, wf) for pair in pairs for wf in wf_grid]
+
+    results = {}
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        _init(frames, use_cache, one_thread=False)
+        for pair, wf in jobs:
+            key, wf_vals, row = _run(pair, wf)
+            results[(key, wf_vals)] = row
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init,
+                                 initargs=(frames, use_cache)) as ex:
+            futs = [ex.submit(_run, pair, wf) for pair, wf in jobs]
+            for f in as_completed(futs):
+                key, wf_vals, row = f.result()
+                results[(key, wf_vals)] = row
+
+    rows = []
+    mixes = {}
+    for p in label_grid:
+        pair = (p["horizon"], p["vol_lookback"])
+        mk = pair + (p["tp_sigma"], p["sl_sigma"])
+        if mk not in mixes:
+            mixes[mk] = label_mix(bars, frames[pair][0].index, *mk)
+        for wf in wf_grid:
+            rows.append({**p, **wf, **mixes[mk], **results[(pair, tuple(wf.values()))]})
+
+    out = pd.DataFrame(rows)
+    for c in METRICS:
+        if c not in out:
+            out[c] = np.nan
+    out = out.sort_values([rank_by, "final_equity"], ascending=False, na_position="last")
+    out.insert(0, "rank", range(1, len(out) + 1))
+    return out.reset_index(drop=True)
+
+def main():
+    ap = argparse.ArgumentParser(description="Sweep labeling / walk-forward parameters")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--prices", default="data/prices.csv", help="Price CSV (run_test.py input)")
+    src.add_argument("--ticker", default=None, help="Read bars (and stored features) for a ticker instead")
+    ap.add_argument("--period", default="2y")
+    ap.add_argument("--horizon", nargs="+", type=int, default=[3])
+    ap.add_argument("--tp-sigma", nargs="+", type=float, default=[0.8])
+    ap.add_argument("--sl-sigma", nargs="+", type=float, default=[0.6])
+    ap.add_argument("--vol-lookback", nargs="+", type=int, default=[5])
+    ap.add_argument("--cost-bps", nargs="+", type=float, default=[1.5])
+    ap.add_argument("--train-frac", nargs="+", type=float, default=[0.7])
+    ap.add_argument("--mode", nargs="+", default=["single"], choices=["single", "rolling", "expanding"])
+    ap.add_argument("--train-size", nargs="+", type=int, default=[None])
+    ap.add_argument("--step", nargs="+", type=int, default=[21])
+    ap.add_argument("--embargo", nargs="+", type=int, default=[0])
+    ap.add_argument("--backend", nargs="+", default=["gbr"])
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--no-cache", action="store_true", help="Do not use the fitted-model cache")
+    ap.add_argument("--rank-by", default="sharpe_like", choices=METRICS)
+    ap.add_argument("--out", default="sweep_results.csv")
+    ap.add_argument("--top", type=int, default=20, help="Rows to print")
+    args = ap.parse_args()
+
+    if args.ticker:
+        from bar_store import default_store
+        from feature_store import default_feature_store
+        bars = default_store(auto_adjust=False).get(args.ticker, period=args.period, interval="1d")
+        if bars.empty:
+            raise SystemExit(f"No data for {args.ticker}")
+        feats = default_feature_store().update(args.ticker, bars, interval="1d")
+    else:
+        bars = load_prices(args.prices)
+        feats = compute_features(bars)
+
+    label_grid = grid(horizon=args.horizon, tp_sigma=args.tp_sigma, sl_sigma=args.sl_sigma,
+                      vol_lookback=args.vol_lookback)
+    wf_grid = grid(cost_bps=args.cost_bps, train_frac=args.train_frac, mode=args.mode,
+                   train_size=args.train_size, step=args.step, embargo=args.embargo,
+                   backend=args.backend)
+    n_bt = len({(p["horizon"], p["vol_lookback"]) for p in label_grid}) * len(wf_grid)
+    print(f"[sweep] {len(label_grid) * len(wf_grid)} combinations, {n_bt} backtests, {args.workers} workers")
+
+    t0 = time.perf_counter()
+    res = sweep(bars, feats, label_grid, wf_grid, workers=args.workers,
+                use_cache=not args.no_cache, rank_by=args.rank_by)
+    res.to_csv(args.out, index=False)
+    print(res.head(args.top).to_string(index=False))
+    print(f"\n[sweep] done in {time.perf_counter() - t0:.1f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()
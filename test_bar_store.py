@@ -0,0 +1,81 @@
+# test_bar_store.py
+# BarStore against CSV fixtures (FixtureSource): a second get() only asks the
+# source for the tail from the bar before the last stored one, the last bar is
+# replaced, and a re-adjusted history is downloaded again instead of merged.
+#
+# Run:
+#   python -m pytest -q test_bar_store.py
+
+import pandas as pd
+from bar_store import BarStore, FixtureSource
+
+class CountingSource(FixtureSource):
+    """FixtureSource that records the start of every batched request."""
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+    def fetch_many(self, symbols, interval, start=None, period="1y", chunk_size=50):
+        self.calls.append((tuple(symbols), start))
+        return super().fetch_many(symbols, interval, start=start, period=period, chunk_size=chunk_size)
+
+def _write(root, symbol, closes, start="2025-01-02"):
+    idx = pd.date_range(start, periods=len(closes), freq="B", name="datetime")
+    df = pd.DataFrame({"open": closes, "high": [c + 1 for c in closes], "low": [c - 1 for c in closes],
+                       "close": closes, "volume": 1000.0}, index=idx)
+    df.to_csv(root / f"{symbol}.csv")
+    return df
+
+def test_tail_refetch_replaces_last_bar(tmp_path):
+    fx = tmp_path / "fixtures"
+    fx.mkdir()
+    _write(fx, "SPY", [100.0, 101.0, 102.0, 103.0])
+    src = CountingSource(fx)
+    store = BarStore(tmp_path / "bars", source=src)
+
+    first = store.get("SPY", period="max")
+    assert len(first) == 4 and src.calls == [(("SPY",), None)]
+
+    # the last bar was partial: revised close, plus two new bars
+    full = _write(fx, "SPY", [100.0, 101.0, 102.0, 103.5, 104.0, 105.0])
+    full.index = full.index.as_unit("ns")
+    second = store.get("SPY", period="max")
+    assert src.calls[1] == (("SPY",), first.index[-2])
+    assert not second.index.duplicated().any()
+    pd.testing.assert_frame_equal(second, full, check_freq=False)
+    pd.testing.assert_frame_equal(store.read("SPY"), full, check_freq=False)
+
+def test_tails_batched_by_anchor_bar(tmp_path):
+    fx = tmp_path / "fixtures"
+    fx.mkdir()
+    for sym in ("AAA", "BBB"):
+        _write(fx, sym, [10.0, 11.0, 12.0])
+    _write(fx, "CCC", [20.0, 21.0])
+    src = CountingSource(fx)
+    store = BarStore(tmp_path / "bars", source=src)
+    store.get_many(["AAA", "BBB", "CCC"], period="max")
+    assert len(src.calls) == 1
+
+    for sym in ("AAA", "BBB"):
+        _write(fx, sym, [10.0, 11.0, 12.0, 13.0])
+    _write(fx, "CCC", [20.0, 21.0, 22.0])
+    out = store.get_many(["AAA", "BBB", "CCC"], period="max")
+    tails = {syms: start for syms, start in src.calls[1:]}
+    assert tails == {("AAA", "BBB"): pd.Timestamp("2025-01-03"), ("CCC",): pd.Timestamp("2025-01-02")}
+    assert [len(out[s]) for s in ("AAA", "BBB", "CCC")] == [4, 4, 3]
+    assert out["AAA"]["close"].iloc[-1] == 13.0 and out["CCC"]["close"].iloc[-1] == 22.0
+
+def test_readjusted_history_is_refetched(tmp_path):
+    fx = tmp_path / "fixtures"
+    fx.mkdir()
+    _write(fx, "SPY", [100.0, 102.0, 104.0, 106.0])
+    src = CountingSource(fx)
+    store = BarStore(tmp_path / "bars", source=src)
+    store.get("SPY", period="max")
+
+    # 2:1 split: the source now serves the whole history halved, plus a new bar
+    full = _write(fx, "SPY", [50.0, 51.0, 52.0, 53.0, 54.0])
+    full.index = full.index.as_unit("ns")
+    got = store.get("SPY", period="max")
+    assert [start for _, start in src.calls[1:]] == [pd.Timestamp("2025-01-06"), None]
+    pd.testing.assert_frame_equal(got, full, check_freq=False)
+    pd.testing.assert_frame_equal(store.read("SPY"), full, check_freq=False)
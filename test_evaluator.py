@@ -0,0 +1,49 @@
+# test_evaluator.py
+# score_ideas on missing / partial daily data and bad levels, and append_log
+# keeping columns an older eval_log.csv does not have.
+#
+# Run:
+#   python -m pytest -q test_evaluator.py
+
+import pandas as pd
+from evaluator import score_ideas, append_log
+
+IDEAS = [{"symbol": "SPY", "entry": 101, "stop": 98, "target": 104},
+         {"symbol": "QQQ", "entry": 201, "stop": 198, "target": 204}]
+
+def _daily(high, low):
+    idx = pd.date_range("2025-01-02", periods=2, freq="B", name="datetime")
+    return pd.DataFrame({"open": 100.0, "high": high, "low": low, "close": 100.0, "volume": 1e6}, index=idx)
+
+def test_no_data_for_any_symbol():
+    out = score_ideas(IDEAS, {})
+    assert list(out["status"]) == ["no_data", "no_data"]
+    assert out["result"].isna().all() and out["triggered"].isna().all()
+
+def test_partial_data():
+    out = score_ideas(IDEAS, {"SPY": _daily(105.0, 99.0)}).set_index("symbol")
+    assert out.loc["SPY", "result"] == "win" and out.loc["SPY", "triggered"] == 1
+    assert pd.isna(out.loc["SPY", "status"])
+    assert out.loc["QQQ", "status"] == "no_data" and pd.isna(out.loc["QQQ", "result"])
+
+def test_invalid_levels_are_errors():
+    ideas = [{"symbol": "SPY", "entry": "abc", "stop": 98, "target": 104},
+             {"symbol": "SPY", "entry": 101, "stop": 98},
+             {"symbol": "SPY", "entry": 101, "stop": 98, "target": 104}]
+    out = score_ideas(ideas, {"SPY": _daily(100.5, 99.0)})
+    assert list(out["status"][:2]) == ["error: invalid entry", "error: invalid target"]
+    assert out["result"][:2].isna().all()
+    assert out["result"][2] == "no_trigger" and pd.isna(out["status"][2])
+
+def test_append_log_adds_new_columns(tmp_path):
+    log = tmp_path / "eval_log.csv"
+    pd.DataFrame([{"date": "2025-01-02", "symbol": "SPY", "result": "win", "rr": 1.5}]).to_csv(log, index=False)
+    append_log(pd.DataFrame([{"date": "2025-01-03", "symbol": "QQQ", "result": "loss", "rr": 2.0,
+                              "resolved": "intraday", "status": None}]), log)
+    append_log(pd.DataFrame([{"date": "2025-01-06", "symbol": "SPY", "result": None, "rr": None,
+                              "resolved": None, "status": "no_data"}]), log)
+    got = pd.read_csv(log)
+    assert list(got.columns) == ["date", "symbol", "result", "rr", "resolved", "status"]
+    assert list(got["symbol"]) == ["SPY", "QQQ", "SPY"]
+    assert list(got["resolved"].fillna("")) == ["", "intraday", ""]
+    assert got["status"].iloc[2] == "no_data" and got["rr"].iloc[0] == 1.5
@@ -0,0 +1,41 @@
+# test_journal_summary.py
+# Checkpointed journal_summary runs must not re-fold trades they already counted.
+#
+# Run:
+#   python -m pytest -q test_journal_summary.py
+
+import json, sys
+import pandas as pd
+import journal_summary
+from journal import Journal, TradeRecord
+
+def _close(j, ticker, pnl):
+    tid = j.add_trade(TradeRecord(ts="2025-01-02 10:00", ticker=ticker, side="LONG",
+                                  status="OPEN", source="paper", entry_spot=100.0))
+    j.update_trade(tid, status="CLOSED", close_ts="2025-01-03 10:00", close_spot=100.0 + pnl,
+                   reason="TP", realized_pnl=pnl)
+
+def _run(monkeypatch, db, ckpt):
+    monkeypatch.setattr(sys, "argv", ["journal_summary.py", "--db", str(db), "--checkpoint", str(ckpt)])
+    journal_summary.main()
+    return pd.read_csv("summary_overall.csv").iloc[0]
+
+def test_checkpoint_runs_without_new_closes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db, ckpt = tmp_path / "journal.db", tmp_path / "state.json"
+    with Journal(db) as j:
+        _close(j, "SPY", 2.0)
+        _close(j, "QQQ", 4.0)
+
+    for _ in range(3):
+        out = _run(monkeypatch, db, ckpt)
+        assert out["trades"] == 2
+        assert out["net_pnl_$"] == 6.0
+    assert json.loads(ckpt.read_text())["recorded_through"] is not None
+
+    with Journal(db) as j:
+        _close(j, "SPY", -1.0)
+    out = _run(monkeypatch, db, ckpt)
+    assert out["trades"] == 3
+    assert out["net_pnl_$"] == 5.0
+    assert _run(monkeypatch, db, ckpt)["trades"] == 3
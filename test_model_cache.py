@@ -0,0 +1,37 @@
+# test_model_cache.py
+# ModelCache.evict with files disappearing under it (shared by pool workers)
+# and *.tmp leftovers from interrupted put() calls.
+#
+# Run:
+#   python -m pytest -q test_model_cache.py
+
+import os, time
+from pathlib import Path
+import model_cache
+from model_cache import ModelCache
+
+def _entry(root, name, size, age):
+    p = root / name
+    p.write_bytes(b"x" * size)
+    t = time.time() - age
+    os.utime(p, (t, t))
+    return p
+
+def test_evict_lru_and_stale_tmp(tmp_path):
+    cache = ModelCache(tmp_path, max_bytes=250)
+    old = _entry(tmp_path, "a.joblib", 100, 30)
+    new = [_entry(tmp_path, f"{k}.joblib", 100, age) for k, age in (("b", 10), ("c", 5))]
+    stale = _entry(tmp_path, "tmp1.tmp", 100, model_cache.TMP_MAX_AGE + 60)
+    live = _entry(tmp_path, "tmp2.tmp", 100, 1)  # another put() may still be writing it
+    cache.evict()
+    assert not old.exists() and all(p.exists() for p in new)
+    assert not stale.exists() and live.exists()
+
+def test_evict_skips_vanished_files(tmp_path, monkeypatch):
+    cache = ModelCache(tmp_path, max_bytes=0)
+    kept = _entry(tmp_path, "a.joblib", 10, 5)
+    real_glob = Path.glob
+    monkeypatch.setattr(Path, "glob", lambda self, pat: [tmp_path / "gone.joblib", tmp_path / "gone.tmp",
+                                                         *real_glob(self, pat)])
+    cache.evict()  # must not raise on the files removed by another worker
+    assert not kept.exists()
@@ -0,0 +1,161 @@
+# test_monitor_entries.py
+# Polling against a fake JSON quote server (the --quotes-url endpoint): batch
+# plus per-symbol fallbacks, slow requests, and one monitor pass end to end.
+#
+# Run:
+#   python -m pytest -q test_monitor_entries.py
+
+import asyncio, json, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+import monitor_entries
+from monitor_entries import HttpQuoteSource, QuotePool, poll_prices, batch_last_prices
+from journal import Journal
+
+class QuoteServer:
+    """GET /quotes?symbols=A,B and /quote/<SYM>; symbols in `unbatched` are left out of
+    /quotes, and `delay` holds {"batch" | SYM: seconds} before answering."""
+
+    def __init__(self, prices, unbatched=(), delay=None):
+        self.prices, self.unbatched, self.delay = dict(prices), set(unbatched), dict(delay or {})
+        self.hits = []
+        srv = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                u = urlparse(self.path)
+                if u.path == "/quotes":
+                    srv.hits.append("batch")
+                    time.sleep(srv.delay.get("batch", 0))
+                    syms = parse_qs(u.query)["symbols"][0].split(",")
+                    body = {s: srv.prices[s] for s in syms if s in srv.prices and s not in srv.unbatched}
+                else:
+                    sym = u.path.rsplit("/", 1)[-1]
+                    srv.hits.append(sym)
+                    time.sleep(srv.delay.get(sym, 0))
+                    body = {"price": srv.prices.get(sym)}
+                raw = json.dumps(body).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(raw)))
+                    self.end_headers()
+                    self.wfile.write(raw)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up at its deadline
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server():
+    made = []
+    def make(*args, **kw):
+        made.append(QuoteServer(*args, **kw))
+        return made[-1]
+    yield make
+    for s in made:
+        s.close()
+
+PRICES = {"AAA": 10.0, "BBB": 20.0, "CCC": 30.0}
+
+def test_batch_with_fallback(server):
+    srv = server(PRICES, unbatched={"CCC"})
+    out = batch_last_prices(list(PRICES), HttpQuoteSource(srv.url), deadline=2.0)
+    assert out == PRICES
+    assert "CCC" in srv.hits
+
+def test_slow_batch_does_not_add_a_deadline(server):
+    srv = server(PRICES, delay={"batch": 3.0})
+    t0 = time.perf_counter()
+    out = batch_last_prices(list(PRICES), HttpQuoteSource(srv.url, timeout=3.0), deadline=1.0)
+    assert out == PRICES  # every fallback answered while the batch was still pending
+    assert time.perf_counter() - t0 < 0.9
+
+def test_slow_symbol_is_bounded_by_the_deadline(server):
+    srv = server(PRICES, unbatched={"BBB", "CCC"}, delay={"BBB": 3.0})
+    t0 = time.perf_counter()
+    out = batch_last_prices(list(PRICES), HttpQuoteSource(srv.url, timeout=5.0), deadline=0.5)
+    assert out == {"AAA": 10.0, "CCC": 30.0}
+    assert time.perf_counter() - t0 < 1.5
+
+def test_stuck_fetches_are_capped():
+    release = threading.Event()
+    calls = []
+
+    class Hanging:
+        def batch(self, symbols):
+            calls.append("batch")
+            release.wait(5)
+            return {}
+        def one(self, symbol):
+            calls.append(symbol)
+            release.wait(5)
+            return None
+
+    pool = QuotePool(concurrency=4, max_stuck=2)
+    try:
+        out = asyncio.run(poll_prices(["A", "B", "C", "D"], Hanging(), deadline=0.2, concurrency=4, pool=pool))
+        assert out == {} and len(pool.stuck) == 5
+        # the next poll is refused instead of queueing behind the stuck threads
+        t0 = time.perf_counter()
+        assert asyncio.run(poll_prices(["A", "B"], Hanging(), deadline=0.2, concurrency=4, pool=pool)) == {}
+        assert time.perf_counter() - t0 < 0.1 and len(calls) == 5
+        release.set()
+        time.sleep(0.2)
+        assert not pool.stuck
+    finally:
+        release.set()
+        pool.shutdown()
+
+def test_monitor_run_with_quotes_url(server, tmp_path, monkeypatch):
+    srv = server({"AAA": 10.5})
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "daily_watchlist.json").write_text(json.dumps(
+        {"ideas": [{"symbol": "AAA", "entry": 10.0, "stop": 9.5, "target": 11.0, "units": 5}]}))
+    monkeypatch.setattr(monitor_entries, "send_telegram", lambda msg: None)
+    monkeypatch.setattr(sys, "argv", ["monitor_entries.py", "--quotes-url", srv.url, "--interval", "0",
+                                      "--deadline", "2", "--buffer-bps", "0"])
+    monitor_entries.main()
+
+    with Journal(tmp_path / "journal.db") as j:
+        tdf = j.trades()
+    assert len(tdf) == 1
+    assert tdf["status"].iloc[0] == "OPEN" and tdf["source"].iloc[0] == "monitor"
+    assert tdf["entry_spot"].iloc[0] == 10.5
+    assert json.loads((tmp_path / "positions.json").read_text())["positions"][0]["symbol"] == "AAA"
+
+def _replay(tmp_path, monkeypatch, ideas, ticks):
+    (tmp_path / "daily_watchlist.json").write_text(json.dumps({"ideas": ideas}))
+    (tmp_path / "ticks.csv").write_text("timestamp,symbol,price\n" + "".join(
+        f"2025-01-02T15:{k:02d}:00Z,{sym},{price}\n" for k, (sym, price) in enumerate(ticks)))
+    monkeypatch.setattr(sys, "argv", ["monitor_entries.py", "--stream", "replay:ticks.csv",
+                                      "--interval", "0", "--buffer-bps", "0"])
+    monitor_entries.main()
+
+def test_open_position_survives_a_watchlist_change(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(monitor_entries, "send_telegram", lambda msg: None)
+    _replay(tmp_path, monkeypatch, [{"symbol": "AAA", "entry": 10.0, "stop": 9.5, "target": 11.0, "units": 5}],
+            [("AAA", 10.2)])
+    # restart with a new plan for AAA: the open position keeps its own stop and target
+    _replay(tmp_path, monkeypatch, [{"symbol": "AAA", "entry": 10.4, "stop": 9.9, "target": 11.4, "units": 5}],
+            [("AAA", 9.0)])
+
+    with Journal(tmp_path / "journal.db") as j:
+        tdf = j.trades()
+    assert len(tdf) == 1
+    t = tdf.iloc[0]
+    assert t["status"] == "CLOSED" and t["reason"] == "SL"
+    assert t["realized_pnl"] == round((9.0 - 10.2) * 5, 2)
+    assert json.loads((tmp_path / "positions.json").read_text())["positions"] == []
@@ -0,0 +1,44 @@
+# test_streaming.py
+# Streaming state (streaming.py) fed bar by bar must give the values of the
+# batch versions on the same bars: indicators.compute_plans and
+# features.compute_features / make_features, on data/prices.csv.
+#
+# Run:
+#   python -m pytest -q test_streaming.py
+
+import numpy as np
+import pytest
+from features import FEATURE_COLS, compute_features, make_features
+from indicators import compute_plans
+from streaming import FeatureState, PlanState
+from sweep import load_prices
+
+@pytest.fixture(scope="module")
+def bars():
+    return load_prices("data/prices.csv")
+
+@pytest.mark.parametrize("kw", [{}, {"atr_floor": True, "fine_ticks": True}])
+def test_plan_state_matches_compute_plans(bars, kw):
+    st = PlanState(risk=250.0, **kw)
+    for k, (h, l, c) in enumerate(bars[["high", "low", "close"]].itertuples(index=False)):
+        st.update(h, l, c)
+        if k < 20 or k % 7 == 0 or k == len(bars) - 1:
+            assert st.plan() == compute_plans({"X": bars.iloc[:k + 1]}, 250.0, **kw)["X"], k
+
+def test_plan_state_seed(bars):
+    assert PlanState.seed(bars, risk=100.0).plan() == compute_plans({"X": bars}, 100.0)["X"]
+
+def test_feature_state_matches_compute_features(bars):
+    batch = compute_features(bars)[FEATURE_COLS].to_numpy()
+    st = FeatureState()
+    rows = [list(st.update(h, l, c).values())
+            for h, l, c in bars[["high", "low", "close"]].itertuples(index=False)]
+    assert FeatureState.NAMES == FEATURE_COLS
+    np.testing.assert_allclose(np.array(rows), batch, rtol=1e-9, atol=1e-12)  # NaN where batch is NaN
+
+def test_feature_state_seed_matches_make_features(bars):
+    df = bars.assign(fwd_ret=0.0)
+    _, X, _ = make_features(df)
+    st = FeatureState.seed(bars)
+    assert st.ready
+    np.testing.assert_allclose([st.values[c] for c in FEATURE_COLS], X.iloc[-1].to_numpy(), rtol=1e-9, atol=1e-12)
@@ -0,0 +1,53 @@
+# test_trade_closer.py
+# auto_close_trades closes journal trades on TP/SL/time, but leaves the
+# positions monitor_entries is watching (positions.json) to the monitor, so
+# each trade has one closer and no OPEN row is left without one.
+#
+# Run:
+#   python -m pytest -q test_trade_closer.py
+
+import json
+import pandas as pd
+from journal import Journal, TradeRecord
+from trade_closer import auto_close_trades
+
+class _Store:
+    """Bar-store stand-in: the same daily bars for every ticker."""
+    def __init__(self, bars):
+        self.bars = bars
+    def get_many(self, tickers, period="2y", interval="1d"):
+        return {t: self.bars for t in tickers}
+
+def _bars():
+    idx = pd.date_range("2025-01-02", periods=5, freq="B", name="datetime")
+    return pd.DataFrame({"open": 100.0, "high": [101, 103, 106, 104, 104], "low": 99.0,
+                         "close": 102.0, "volume": 1e6}, index=idx)
+
+def _open(j, source):
+    return j.add_trade(TradeRecord(ts="2025-01-02 10:00", ticker="SPY", side="LONG", status="OPEN",
+                                   source=source, entry_spot=100.0, shares=10,
+                                   tp_spot=105.0, sl_spot=95.0))
+
+def test_only_held_monitor_trades_are_left_open(tmp_path):
+    db, positions = tmp_path / "journal.db", tmp_path / "positions.json"
+    with Journal(db) as j:
+        paper, held, orphan = _open(j, "paper"), _open(j, "monitor"), _open(j, "monitor")
+    positions.write_text(json.dumps({"positions": [{"symbol": "SPY", "trade_id": held}]}))
+
+    out = auto_close_trades(db, store=_Store(_bars()), positions_path=positions)
+    assert out["closed"] == 2 and out["open_remaining"] == 0 and out["monitor_held"] == 1
+
+    with Journal(db) as j:
+        rows = j.trades().set_index("id")
+    for tid in (paper, orphan):
+        assert rows.loc[tid, "status"] == "CLOSED"
+        assert rows.loc[tid, "reason"] == "TP"
+        assert rows.loc[tid, "realized_pnl"] == 50.0
+    assert rows.loc[held, "status"] == "OPEN"
+
+def test_without_positions_file_every_open_trade_is_closed(tmp_path):
+    db = tmp_path / "journal.db"
+    with Journal(db) as j:
+        _open(j, "paper"), _open(j, "monitor")
+    out = auto_close_trades(db, store=_Store(_bars()), positions_path=tmp_path / "missing.json")
+    assert out["closed"] == 2 and out["monitor_held"] == 0
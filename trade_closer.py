@@ -1,5 +1,15 @@
+import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from bar_store import default_store
+from journal import Journal, JOURNAL_PATH
+
+POSITIONS_PATH = "positions.json"  # monitor_entries.PositionBook
+
+# reason codes returned by first_hits
+NO_HIT, TP, SL, TIME = 0, 1, 2, 3
+REASONS = {TP: "TP", SL: "SL", TIME: "TIME"}
 
 def _to_date(s):
     # handle "YYYY-MM-DD HH:MM:SS" or date-only
@@ -8,109 +18,208 @@ def _to_date(s):
     except Exception:
         return pd.NaT
 
-def _first_hit(row, px: pd.DataFrame, max_hold_days: int):
-    """
-    Find the first day after entry where TP or SL is touched using daily OHLC.
-    Returns (close_date, close_spot, reason) or (None, None, None).
-    """
-    side = str(row.get("side", "")).upper()
-    entry = _to_date(row.get("ts"))
-    if pd.isna(entry) or side not in ("LONG", "SHORT"):
-        return None, None, None
-
-    tp = float(row.get("tp_spot", None))
-    sl = float(row.get("sl_spot", None))
-    entry_spot = float(row.get("entry_spot", None))
-
-    # price rows strictly AFTER entry date, up to hold window
-    start = entry + pd.Timedelta(days=1)
-    end = entry + pd.Timedelta(days=max_hold_days)
-    df = px.loc[(px.index >= start) & (px.index <= end)]
-    if df.empty:
-        return None, None, None
-
-    if side == "LONG":
-        # TP: high >= tp ; SL: low <= sl
-        tp_hits = df[df["high"] >= tp]
-        sl_hits = df[df["low"]  <= sl]
-    else:  # SHORT
-        # TP for short = price goes DOWN to tp (low <= tp)
-        # SL for short = price goes UP to sl (high >= sl)
-        tp_hits = df[df["low"]  <= tp]
-        sl_hits = df[df["high"] >= sl]
-
-    # choose earliest hit by date
-    first_tp_date = tp_hits.index.min() if not tp_hits.empty else None
-    first_sl_date = sl_hits.index.min() if not sl_hits.empty else None
-
-    # decide which happened first
-    if first_tp_date is not None and (first_sl_date is None or first_tp_date <= first_sl_date):
-        d = first_tp_date
-        # fill price at touch; use tp as proxy
-        return d, float(tp), "TP"
-    if first_sl_date is not None:
-        d = first_sl_date
-        return d, float(sl), "SL"
-
-    # no hit within window
-    # time exit on last available bar in window
-    lastd = df.index.max()
-    close_spot = float(df.loc[lastd, "close"])
-    return lastd, close_spot, "TIME"
-
-def auto_close_trades(prices_path="data/prices.csv",
-                      trades_path="trades_log.csv",
-                      max_hold_days: int = 20):
-    """
-    Marks OPEN trades CLOSED when TP/SL (or time) is hit.
-    Adds columns: close_ts, close_spot, reason, realized_pnl.
-    Returns a summary dict.
-    """
-    # load prices (daily OHLC)
-    px = pd.read_csv(prices_path, parse_dates=["datetime"]).set_index("datetime").sort_index()
-    # ensure numeric
+def _load_prices(path) -> pd.DataFrame:
+    """Daily OHLC from a prices CSV, numeric and sorted by datetime."""
+    px = pd.read_csv(path, parse_dates=["datetime"]).set_index("datetime").sort_index()
     for c in ["open","high","low","close","volume"]:
         px[c] = pd.to_numeric(px[c], errors="coerce")
-    px = px.dropna(subset=["open","high","low","close"])
-
-    # load trades
-    tdf = pd.read_csv(trades_path) if pd.io.common.file_exists(trades_path) else pd.DataFrame()
-    if tdf.empty:
-        return {"closed": 0, "open_remaining": 0}
+    return px.dropna(subset=["open","high","low","close"])
 
-    # ensure needed cols exist
-    for col in ["status","side","entry_spot","tp_spot","sl_spot","shares","contracts","ts"]:
-        if col not in tdf.columns:
-            tdf[col] = None
+def monitor_trade_ids(path=POSITIONS_PATH) -> set:
+    """Journal ids of the positions monitor_entries is watching (its positions.json)."""
+    try:
+        with open(path) as f:
+            saved = json.load(f).get("positions", [])
+    except (OSError, ValueError):
+        return set()
+    return {int(p["trade_id"]) for p in saved if p.get("trade_id") is not None}
 
-    closed_count = 0
-    for i, row in tdf.iterrows():
-        if str(row.get("status","")).upper() != "OPEN":
-            continue
+class TickerPrices(dict):
+    """
+    {ticker: daily OHLC} for one closer run. Bars come from the shared bar store
+    the first time a ticker is asked for (load() batches several) and are reused
+    for the rest of the run.
+    """
 
-        close_date, close_spot, reason = _first_hit(row, px, max_hold_days)
-        if close_date is None:
+    def __init__(self, store=None, period: str = "2y", interval: str = "1d"):
+        super().__init__()
+        self.store = store
+        self.period = period
+        self.interval = interval
+
+    def load(self, tickers) -> dict:
+        need = [t for t in dict.fromkeys(tickers) if t not in self]
+        if need:
+            if self.store is None:
+                self.store = default_store(auto_adjust=False)
+            got = self.store.get_many(need, period=self.period, interval=self.interval)
+            for t in need:
+                px = got.get(t)
+                if px is not None and px.index.tz is not None:
+                    px = px.tz_localize(None)  # exchange-local dates, like data/prices.csv
+                self[t] = px
+        return {t: self[t] for t in tickers}
+
+    def __missing__(self, ticker):
+        return self.load([ticker])[ticker]
+
+def first_hits(entry, side, tp, sl, px: pd.DataFrame, max_hold_days: int):
+    """
+    Resolve many trades against one daily OHLC series at once.
+    entry: datetime64[ns] entry dates (normalized); side: +1 long / -1 short / 0 skip;
+    tp, sl: float arrays. Bars strictly after the entry date, up to entry + max_hold_days,
+    are checked; TP wins a tie with SL on the same bar, and with no hit the trade
+    exits on the last bar in the window (TIME).
+    Returns (bar index or -1, close_spot, reason code) arrays.
+    """
+    n = len(entry)
+    bar = np.full(n, -1, dtype=np.int64)
+    spot = np.full(n, np.nan)
+    code = np.full(n, NO_HIT, dtype=np.int8)
+    if n == 0 or px.empty:
+        return bar, spot, code
+
+    idx = px.index.values.astype("datetime64[ns]")
+    high = px["high"].to_numpy(float)
+    low = px["low"].to_numpy(float)
+    close = px["close"].to_numpy(float)
+
+    # window [start, end) of bar offsets per trade
+    day = np.timedelta64(1, "D")
+    start = np.searchsorted(idx, entry + day, side="left")
+    end = np.searchsorted(idx, entry + max_hold_days * day, side="right")
+    length = np.where((side != 0) & ~np.isnat(entry), end - start, 0).clip(min=0)
+    live = length > 0
+    if not live.any():
+        return bar, spot, code
+
+    # (trades × window) gather; the window is at most max_hold_days bars wide
+    w = int(length.max())
+    off = np.arange(w)
+    pos = start[:, None] + off
+    valid = off < length[:, None]
+    pos = np.where(valid, pos, 0)
+    h, l = high[pos], low[pos]
+
+    long_ = (side == 1)[:, None]
+    tp_hit = valid & np.where(long_, h >= tp[:, None], l <= tp[:, None])
+    sl_hit = valid & np.where(long_, l <= sl[:, None], h >= sl[:, None])
+    tp_any, sl_any = tp_hit.any(axis=1), sl_hit.any(axis=1)
+    tp_at = np.where(tp_any, tp_hit.argmax(axis=1), w)
+    sl_at = np.where(sl_any, sl_hit.argmax(axis=1), w)
+
+    is_tp = live & tp_any & (tp_at <= sl_at)
+    is_sl = live & sl_any & ~is_tp
+    is_time = live & ~is_tp & ~is_sl
+
+    bar[is_tp] = start[is_tp] + tp_at[is_tp]
+    spot[is_tp] = tp[is_tp]
+    code[is_tp] = TP
+    bar[is_sl] = start[is_sl] + sl_at[is_sl]
+    spot[is_sl] = sl[is_sl]
+    code[is_sl] = SL
+    bar[is_time] = end[is_time] - 1
+    spot[is_time] = close[bar[is_time]]
+    code[is_time] = TIME
+    return bar, spot, code
+
+def close_trades(tdf: pd.DataFrame, prices, max_hold_days: int = 20) -> int:
+    """
+    Close OPEN rows of tdf in place. prices is one OHLC frame applied to every
+    trade, or a {ticker: frame} dict (trades without a matching frame stay open).
+    Returns the number of trades closed.
+    """
+    is_open = tdf["status"].astype(str).str.upper().eq("OPEN").to_numpy()
+    if not is_open.any():
+        return 0
+    for col in ["close_ts","close_spot","reason","realized_pnl"]:
+        if col not in tdf.columns:
+            tdf[col] = None if col in ("close_ts","reason") else np.nan
+    tdf["close_ts"] = tdf["close_ts"].astype(object)
+    tdf["reason"] = tdf["reason"].astype(object)
+
+    rows = np.flatnonzero(is_open)
+    sub = tdf.iloc[rows]
+    side_s = sub["side"].astype(str).str.upper()
+    side = np.select([side_s.eq("LONG"), side_s.eq("SHORT")], [1, -1], 0)
+    entry = pd.to_datetime(sub["ts"], errors="coerce").dt.normalize().to_numpy("datetime64[ns]")
+    tp = pd.to_numeric(sub["tp_spot"], errors="coerce").to_numpy(float)
+    sl = pd.to_numeric(sub["sl_spot"], errors="coerce").to_numpy(float)
+    entry_spot = pd.to_numeric(sub["entry_spot"], errors="coerce").fillna(0.0).to_numpy(float)
+    shares = pd.to_numeric(sub["shares"], errors="coerce").fillna(0).astype(int).to_numpy()
+
+    if isinstance(prices, dict):
+        tick = (sub["ticker"].fillna("").astype(str).str.strip().str.upper().to_numpy()
+                if "ticker" in sub else np.full(len(sub), ""))
+        groups = [(tick == t, px) for t, px in prices.items() if px is not None]
+    else:
+        groups = [(np.ones(len(sub), dtype=bool), prices)]
+
+    bar = np.full(len(sub), -1, dtype=np.int64)
+    spot = np.full(len(sub), np.nan)
+    code = np.full(len(sub), NO_HIT, dtype=np.int8)
+    when = np.full(len(sub), np.datetime64("NaT"), dtype="datetime64[ns]")
+    for m, px in groups:
+        if not m.any():
             continue
-
-        # realized PnL (equity leg only)
-        side = str(row.get("side","")).upper()
-        shares = int(row.get("shares") or 0)
-        entry_spot = float(row.get("entry_spot") or 0.0)
-
-        if side == "LONG":
-            pnl = (close_spot - entry_spot) * shares
-        elif side == "SHORT":
-            pnl = (entry_spot - close_spot) * shares
-        else:
-            pnl = 0.0
-
-        tdf.loc[i, "status"] = "CLOSED"
-        tdf.loc[i, "close_ts"] = close_date.strftime("%Y-%m-%d")
-        tdf.loc[i, "close_spot"] = round(close_spot, 4)
-        tdf.loc[i, "reason"] = reason
-        tdf.loc[i, "realized_pnl"] = round(pnl, 2)
-        closed_count += 1
-
-    tdf.to_csv(trades_path, index=False)
-    open_remaining = (tdf["status"].str.upper() == "OPEN").sum()
-    return {"closed": closed_count, "open_remaining": int(open_remaining)}
+        b, s, c = first_hits(entry[m], side[m], tp[m], sl[m], px, max_hold_days)
+        bar[m], spot[m], code[m] = b, s, c
+        hit = b >= 0
+        w = when[m]
+        w[hit] = px.index.values.astype("datetime64[ns]")[b[hit]]
+        when[m] = w
+
+    done = code != NO_HIT
+    if not done.any():
+        return 0
+    # realized PnL (equity leg only)
+    pnl = (spot - entry_spot) * shares * side
+    at = tdf.index[rows[done]]
+    tdf.loc[at, "status"] = "CLOSED"
+    tdf.loc[at, "close_ts"] = pd.DatetimeIndex(when[done]).strftime("%Y-%m-%d")
+    tdf.loc[at, "close_spot"] = np.round(spot[done], 4)
+    tdf.loc[at, "reason"] = [REASONS[c] for c in code[done]]
+    tdf.loc[at, "realized_pnl"] = np.round(pnl[done], 2)
+    return int(done.sum())
+
+def auto_close_trades(journal_path=JOURNAL_PATH,
+                      max_hold_days: int = 20,
+                      store=None,
+                      prices_path=None,
+                      positions_path=POSITIONS_PATH):
+    """
+    Marks OPEN journal trades CLOSED when TP/SL (or time) is hit.
+    Only OPEN rows are read (status index) and only the closed ones are
+    updated, by id, in one transaction. Trades listed in the monitor's
+    positions_path are left alone: monitor_entries closes those itself on its
+    own stop/target. Every other OPEN row is resolved here, monitor-sourced
+    ones included (migrated trigger rows, positions the monitor no longer holds).
+    Each ticker's trades are resolved against that ticker's daily bars, loaded
+    once per run from the bar store (store=None uses default_store). Rows
+    without a ticker fall back to the prices CSV at prices_path, if given.
+    Sets: status, close_ts, close_spot, reason, realized_pnl.
+    Returns a summary dict (monitor_held: OPEN trades left to the monitor).
+    """
+    with Journal(journal_path) as j:
+        tdf = j.trades(status="OPEN")
+        held = tdf["id"].isin(monitor_trade_ids(positions_path))
+        tdf = tdf[~held].reset_index(drop=True)
+        if tdf.empty:
+            return {"closed": 0, "open_remaining": 0, "monitor_held": int(held.sum())}
+
+        # daily bars for every ticker with an OPEN trade, far enough back for the oldest entry
+        tickers = tdf["ticker"].dropna().astype(str).str.strip().str.upper()
+        tickers = sorted(t for t in set(tickers) if t)
+        oldest = pd.to_datetime(tdf["ts"], errors="coerce").min()
+        period = "2y" if pd.isna(oldest) or oldest >= pd.Timestamp.now() - pd.Timedelta(days=700) else "max"
+        prices = TickerPrices(store, period=period)
+        prices.load(tickers)
+        if prices_path:
+            prices[""] = _load_prices(prices_path)
+
+        closed_count = close_trades(tdf, dict(prices), max_hold_days)
+        done = tdf[tdf["status"] == "CLOSED"]
+        j.update_trades(done[["id", "status", "close_ts", "close_spot", "reason", "realized_pnl"]])
+
+    return {"closed": closed_count, "open_remaining": int(len(tdf) - len(done)), "tickers": len(tickers),
+            "monitor_held": int(held.sum())}
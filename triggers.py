@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# triggers.py
+# Price-level index over the watchlist: compiled once, then every price update
+# finds the crossed entry / stop / target levels by bisection instead of
+# walking all ideas and re-parsing their JSON fields.
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Tuple
+
+class Idea:
+    """One watchlist idea with its levels parsed once."""
+    __slots__ = ("symbol", "entry", "stop", "target", "units", "rr", "trigger")
+
+    def __init__(self, raw: Dict[str, Any], buffer: float = 0.0):
+        self.symbol = str(raw["symbol"])
+        self.entry = float(raw["entry"])
+        self.stop = float(raw["stop"])
+        self.target = float(raw["target"])
+        self.units = raw.get("units", 0)
+        self.rr = abs(self.target - self.entry) / max(abs(self.entry - self.stop), 1e-6)
+        self.trigger = self.entry * (1 + buffer)
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol}:{self.entry}"
+
+class Levels:
+    """
+    Sorted price levels for one symbol and one direction, stored in a compact
+    array('d') alongside their items. up=True fires when price >= level,
+    up=False when price <= level.
+    """
+    __slots__ = ("up", "prices", "items")
+
+    def __init__(self, up: bool):
+        self.up = up
+        self.prices = array("d")
+        self.items: List[Any] = []
+
+    def add(self, price: float, item):
+        k = bisect_right(self.prices, price)
+        self.prices.insert(k, price)
+        self.items.insert(k, item)
+
+    def remove(self, price: float, item) -> bool:
+        k = bisect_left(self.prices, price)
+        while k < len(self.prices) and self.prices[k] == price:
+            if self.items[k] is item:
+                del self.prices[k]
+                del self.items[k]
+                return True
+            k += 1
+        return False
+
+    def crossed(self, price: float) -> List[Any]:
+        """Pop and return every item whose level the price has reached."""
+        if self.up:
+            k = bisect_right(self.prices, price)
+            hit = self.items[:k]
+            del self.prices[:k]
+            del self.items[:k]
+        else:
+            k = bisect_left(self.prices, price)
+            hit = self.items[k:]
+            del self.prices[k:]
+            del self.items[k:]
+        return hit
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+class TriggerIndex:
+    """
+    Per-symbol sorted levels for long ideas:
+    - entries fire when price >= entry * (1 + buffer); each idea fires once
+    - after arm(idea), its stop fires when price <= stop and its target when price >= target
+    """
+
+    def __init__(self, ideas: List[Dict[str, Any]], buffer: float = 0.0):
+        self.entries: Dict[str, Levels] = {}
+        self.stops: Dict[str, Levels] = {}
+        self.targets: Dict[str, Levels] = {}
+        seen = set()
+        for raw in ideas:
+            idea = Idea(raw, buffer)
+            if idea.key in seen:  # same idea listed twice triggers once
+                continue
+            seen.add(idea.key)
+            self.entries.setdefault(idea.symbol, Levels(up=True)).add(idea.trigger, idea)
+
+    @property
+    def symbols(self) -> List[str]:
+        """Symbols that still have pending entries or armed exits."""
+        live = set()
+        for book in (self.entries, self.stops, self.targets):
+            live.update(s for s, lv in book.items() if len(lv))
+        return sorted(live)
+
+    def update(self, symbol: str, price: float) -> List[Idea]:
+        """Ideas whose entry trigger is crossed by price (removed from the index)."""
+        lv = self.entries.get(symbol)
+        return lv.crossed(price) if lv else []
+
+    def arm(self, idea: Idea):
+        """Start watching the stop and target of a triggered idea."""
+        self.stops.setdefault(idea.symbol, Levels(up=False)).add(idea.stop, idea)
+        self.targets.setdefault(idea.symbol, Levels(up=True)).add(idea.target, idea)
+
+    def restore(self, raw: Dict[str, Any]) -> Idea:
+        """
+        Re-arm an open position after a restart from its saved levels (symbol,
+        entry, stop, target, units), whether or not today's watchlist still lists
+        it. A pending entry with the same key is dropped so it cannot fire again.
+        """
+        idea = Idea(raw)
+        lv = self.entries.get(idea.symbol)
+        for pending in list(lv.items if lv else []):
+            if pending.key == idea.key:
+                lv.remove(pending.trigger, pending)
+        self.arm(idea)
+        return idea
+
+    def exits(self, symbol: str, price: float) -> List[Tuple[Idea, str]]:
+        """(idea, "STOP"|"TARGET") for armed ideas whose exit level the price reached."""
+        out = []
+        lv = self.stops.get(symbol)
+        for idea in (lv.crossed(price) if lv else []):
+            self.targets[symbol].remove(idea.target, idea)
+            out.append((idea, "STOP"))
+        lv = self.targets.get(symbol)
+        for idea in (lv.crossed(price) if lv else []):
+            self.stops[symbol].remove(idea.stop, idea)
+            out.append((idea, "TARGET"))
+        return out
+
+    def __len__(self) -> int:
+        """Untriggered entries plus armed ideas."""
+        return sum(len(v) for v in self.entries.values()) + sum(len(v) for v in self.stops.values())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# tuning.py
+# Budgeted hyperparameter search for the quantile models in models.py.
+# Successive halving per quantile: a batch of random configs (plus the current
+# defaults) is trained for a few boosting rounds on the first part of the
+# training rows and scored by pinball loss on the time-ordered tail; the best
+# 1/eta of each rung keep training (warm start, no refit) for eta times more
+# rounds, the rest are dropped. Validation loss is checked after every chunk of
+# rounds, so each trial also remembers its best round count (early stopping).
+# Trials run in a process pool; workers stop adding rounds once the wall-clock
+# budget is spent, and the lowest validation loss seen at any (config, rounds)
+# wins. Results go to data/tuned/<TICKER>.json, which
+# refresh.py / batch_refresh.py pick up through load_params().
+#
+# Run:
+#   python tuning.py --tickers SPY QQQ AAPL --budget 1800 --workers 8   # nightly, total budget
+#   python tuning.py --prices data/prices.csv --backend hgb --budget 120 --no-save
+
+import argparse, json, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_pinball_loss
+from threadpoolctl import threadpool_limits
+from models import _q_model, BACKENDS
+
+TUNED_DIR = Path(__file__).resolve().parent / "data" / "tuned"
+QUANTILES = (0.15, 0.5, 0.85)
+
+# search spaces; the boosting-round count is the resource successive halving allocates
+SPACES = {
+    "gbr": {"max_depth": [2, 3, 4, 5], "learning_rate": [0.02, 0.05, 0.1, 0.2],
+            "subsample": [0.5, 0.7, 0.8, 1.0], "min_samples_leaf": [1, 5, 10, 25]},
+    "hgb": {"max_depth": [2, 3, 4, 6], "learning_rate": [0.03, 0.05, 0.1, 0.2],
+            "max_leaf_nodes": [7, 15, 31], "min_samples_leaf": [5, 10, 20, 40],
+            "l2_regularization": [0.0, 0.1, 1.0]},
+}
+RESOURCE = {"gbr": "n_estimators", "hgb": "max_iter"}
+
+# ---------- split / configs ----------
+
+def time_split(X, y, val_frac: float = 0.25, gap: int = 0):
+    """Oldest rows train, newest val_frac validate; gap rows between them are dropped
+    so labels of the last training rows do not look into the validation block."""
+    n = len(X)
+    cut = int(n * (1 - val_frac))
+    return X.iloc[:max(cut - gap, 1)], y.iloc[:max(cut - gap, 1)], X.iloc[cut:], y.iloc[cut:]
+
+def default_config(backend: str) -> dict:
+    p = _q_model(0.5, backend).get_params()
+    return {k: p[k] for k in SPACES[backend]}
+
+def sample_configs(backend: str, n: int, seed: int = 0) -> list:
+    """The current defaults plus up to n-1 distinct random configs."""
+    rng = np.random.default_rng(seed)
+    space = SPACES[backend]
+    out = [default_config(backend)]
+    seen = {tuple(sorted(out[0].items()))}
+    for _ in range(n * 20):
+        if len(out) >= n:
+            break
+        c = {k: v[int(rng.integers(len(v)))] for k, v in space.items()}
+        c = {k: (v.item() if hasattr(v, "item") else v) for k, v in c.items()}
+        key = tuple(sorted(c.items()))
+        if key not in seen:
+            seen.add(key)
+            out.append(c)
+    return out
+
+# ---------- worker ----------
+
+def _init():
+    threadpool_limits(1)  # one core per worker; the pool is the parallelism
+
+def _advance(backend, q, config, model, rounds, target, data, deadline, chunk):
+    """
+    Worker: grow one trial to `target` boosting rounds in chunks (warm start),
+    stopping early at the deadline. Returns (model, rounds, validation pinball
+    at rounds, (best rounds, best pinball) over the chunks fitted here).
+    """
+    X_tr, y_tr, X_val, y_val = data
+    res = RESOURCE[backend]
+    if model is None:
+        model = _q_model(q, backend, {**config, "warm_start": True})
+    score, best = float("inf"), (0, float("inf"))
+    while rounds < target and time.time() < deadline:
+        rounds = min(rounds + chunk, target)
+        model.set_params(**{res: rounds}).fit(X_tr, y_tr)
+        score = mean_pinball_loss(y_val, model.predict(X_val), alpha=q)
+        if score < best[1]:
+            best = (rounds, score)
+    return model, rounds, score, best
+
+# ---------- search ----------
+
+def search(X, y, quantiles=QUANTILES, backend="gbr", budget: float = 120.0, n_trials: int = 27,
+           eta: int = 3, min_rounds: int = 25, max_rounds: int = 675, val_frac: float = 0.25,
+           gap: int = 0, workers=None, executor=None, seed: int = 0):
+    """
+    Successive halving over sample_configs() for every quantile within `budget`
+    seconds. Returns ({q: best params incl. round count}, report frame with one
+    row per trial and quantile: rounds trained, best rounds and its pinball).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown model backend: {backend} (choose from {BACKENDS})")
+    deadline = time.time() + budget
+    data = time_split(X, y, val_frac, gap)
+    configs = sample_configs(backend, n_trials, seed)
+    trials = {(q, i): {"model": None, "rounds": 0, "rung": 0, "score": float("inf"),
+                       "best_rounds": 0, "best": float("inf")}
+              for q in quantiles for i in range(len(configs))}
+    alive = {q: list(range(len(configs))) for q in quantiles}
+
+    ex = executor or ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init)
+    try:
+        target = min_rounds
+        while True:
+            futs = {ex.submit(_advance, backend, q, configs[i], trials[q, i]["model"], trials[q, i]["rounds"],
+                              target, data, deadline, min_rounds): (q, i)
+                    for q in quantiles for i in alive[q]}
+            for f in as_completed(futs):
+                t = trials[futs[f]]
+                t["model"], t["rounds"], score, (b_rounds, b_score) = f.result()
+                if t["rounds"] == target:
+                    t["rung"], t["score"] = target, score
+                if b_score < t["best"]:
+                    t["best_rounds"], t["best"] = b_rounds, b_score
+            if time.time() >= deadline or target >= max_rounds:
+                break
+            for q in quantiles:
+                done = sorted((i for i in alive[q] if trials[q, i]["rung"] == target),
+                              key=lambda i: trials[q, i]["score"])
+                alive[q] = done[:max(1, len(done) // eta)]
+            target = min(target * eta, max_rounds)
+    finally:
+        if executor is None:
+            ex.shutdown(cancel_futures=True)
+
+    best, rows = {}, []
+    for q in quantiles:
+        i_best = min(range(len(configs)), key=lambda i: trials[q, i]["best"])
+        t = trials[q, i_best]
+        if not t["best_rounds"]:
+            continue  # budget too small for a single chunk
+        best[q] = {**configs[i_best], RESOURCE[backend]: t["best_rounds"]}
+        for i, c in enumerate(configs):
+            t = trials[q, i]
+            rows.append({"q": q, "trial": i, **c, "rounds": t["rounds"], "best_rounds": t["best_rounds"],
+                         "val_pinball": t["best"], "default": i == 0, "best": i == i_best})
+    return best, pd.DataFrame(rows)
+
+# ---------- persistence ----------
+
+def params_path(ticker: str, root=TUNED_DIR) -> Path:
+    return Path(root) / f"{ticker.upper()}.json"
+
+def save_params(ticker: str, backend: str, best: dict, report: pd.DataFrame, rows: int, root=TUNED_DIR):
+    def score(q, col):
+        r = report[(report.q == q) & report[col]]
+        return None if r.empty else round(float(r.val_pinball.iloc[0]), 8)
+    state = {
+        "backend": backend,
+        "params": {str(q): p for q, p in best.items()},
+        "val_pinball": {str(q): score(q, "best") for q in best},
+        "default_pinball": {str(q): score(q, "default") for q in best},
+        "rows": int(rows),
+        "tuned_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    p = params_path(ticker, root)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(p)
+
+def load_params(ticker: str, backend: str = "gbr", root=TUNED_DIR):
+    """{q: params} tuned for ticker and backend, or None (models.py defaults)."""
+    p = params_path(ticker, root)
+    if not p.exists():
+        return None
+    try:
+        state = json.loads(p.read_text())
+    except Exception:
+        return None
+    if state.get("backend") != backend:
+        return None
+    return {float(q): params for q, params in state.get("params", {}).items()} or None
+
+# ---------- main ----------
+
+def main():
+    ap = argparse.ArgumentParser(description="Tune quantile model hyperparameters per ticker")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--tickers", nargs="*", default=None, help="Tune these tickers (bar store + feature store)")
+    src.add_argument("--prices", default=None, help="Tune on a price CSV instead (saved as --name)")
+    ap.add_argument("--name", default="PRICES", help="Key for --prices results")
+    ap.add_argument("--backend", default="gbr", choices=BACKENDS)
+    ap.add_argument("--budget", type=float, default=600.0, help="Wall-clock seconds for the whole run")
+    ap.add_argument("--trials", type=int, default=27)
+    ap.add_argument("--eta", type=int, default=3)
+    ap.add_argument("--min-rounds", type=int, default=25)
+    ap.add_argument("--max-rounds", type=int, default=675)
+    ap.add_argument("--train-frac", type=float, default=0.7, help="Only the walk-forward training rows are used")
+    ap.add_argument("--gap", type=int, default=3, help="Rows dropped before the validation block (label horizon)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--no-save", action="store_true")
+    args = ap.parse_args()
+
+    from refresh import labelled
+    if args.prices:
+        from sweep import load_prices
+        frames = {args.name: load_prices(args.prices)}
+    else:
+        from bar_store import default_store
+        from batch_refresh import ETFS
+        tickers = list(dict.fromkeys(t.upper() for t in (args.tickers or ETFS)))
+        frames = default_store(auto_adjust=False).get_many(tickers, period="2y", interval="1d")
+
+    t0 = time.perf_counter()
+    end = time.time() + args.budget
+    summary = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init) as ex:
+        for k, (ticker, bars) in enumerate(frames.items()):
+            if bars is None or bars.empty:
+                summary.append({"ticker": ticker, "error": "no data"})
+                continue
+            budget = (end - time.time()) / (len(frames) - k)  # leftover time rolls forward
+            _, X, y = labelled(ticker, bars)
+            cut = max(int(len(X) * args.train_frac), 50)
+            best, report = search(X.iloc[:cut], y.iloc[:cut], QUANTILES, args.backend, budget,
+                                  args.trials, args.eta, args.min_rounds, args.max_rounds,
+                                  gap=args.gap, executor=ex)
+            if not best:
+                summary.append({"ticker": ticker, "error": "budget too small for one rung"})
+                continue
+            if not args.no_save:
+                save_params(ticker, args.backend, best, report, cut)
+            row = {"ticker": ticker, "rows": cut}
+            for q in best:
+                r = report[report.q == q]
+                row[f"pinball_{q}"] = round(float(r[r.best].val_pinball.iloc[0]), 6)
+                row[f"default_{q}"] = round(float(r[r.default].val_pinball.iloc[0]), 6)
+                row[f"rounds_{q}"] = best[q][RESOURCE[args.backend]]
+            summary.append(row)
+            print(f"[tune] {ticker}: " + ", ".join(f"q={q} {best[q]}" for q in best))
+
+    print(pd.DataFrame(summary).to_string(index=False))
+    print(f"\n[tune] done in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()